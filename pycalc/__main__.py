@@ -1,18 +1,51 @@
 import argparse
 import sys
 
+from pycalc.compile.expression import Environment, compile_expression
+from pycalc.distributed import DEFAULT_SHARD_SIZE, DEFAULT_TIMEOUT, Coordinator, WorkerServer, parse_address
+from pycalc.profiling import profile_memory, format_profile
 from pycalc.pycalc import evaluate
 
 try:
     parser = argparse.ArgumentParser(description="Pure-python command-line calculator.")
-    parser.add_argument("expression", metavar="EXPRESSION", type=str, help="expression string to evaluate")
+    parser.add_argument("expression", metavar="EXPRESSION", type=str, nargs="?", help="expression string to evaluate")
     parser.add_argument("-m", "--use-modules", metavar="MODULE", action="append", nargs='+',
                         help="additional modules to use")
+    parser.add_argument("--profile-mem", action="store_true",
+                        help="print memory allocated by parsing and evaluation to stderr")
+    parser.add_argument("--worker", metavar="HOST:PORT", help="run worker that evaluates shards sent by coordinator")
+    parser.add_argument("--coordinator", action="store_true",
+                        help="evaluate expressions from stdin, one per line, on workers")
+    parser.add_argument("--workers", metavar="HOST:PORT", nargs="+", help="addresses of workers for coordinator")
+    parser.add_argument("--shard-size", metavar="SIZE", type=int, default=DEFAULT_SHARD_SIZE,
+                        help="count of expressions sent to worker at once")
+    parser.add_argument("--timeout", metavar="SECONDS", type=float, default=DEFAULT_TIMEOUT,
+                        help="maximal time to wait for worker response before shard is sent again")
     args = parser.parse_args()
     use_modules = []
     if args.use_modules:
         use_modules = [module for sublist in args.use_modules for module in sublist]
-    result = evaluate(use_modules, args.expression)
-    print(result)
+    if args.worker:
+        WorkerServer(parse_address(args.worker), use_modules).serve_forever()
+    elif args.coordinator:
+        if not args.workers:
+            raise ValueError("Coordinator requires --workers")
+        expressions = [line.strip() for line in sys.stdin if line.strip()]
+        coordinator = Coordinator([parse_address(worker) for worker in args.workers], args.shard_size,
+                                  args.timeout, Environment(use_modules))
+        for result in coordinator.evaluate(expressions):
+            print(result["result"] if "result" in result else "ERROR: " + result["error"])
+    elif args.expression is None:
+        raise ValueError("Expression is required")
+    elif args.profile_mem:
+        environment = Environment(use_modules)
+        expression, parse_profile = profile_memory(compile_expression, args.expression, environment)
+        result, evaluate_profile = profile_memory(expression.evaluate)
+        print(format_profile("parse", parse_profile), file=sys.stderr)
+        print(format_profile("evaluate", evaluate_profile), file=sys.stderr)
+        print(result)
+    else:
+        result = evaluate(use_modules, args.expression)
+        print(result)
 except Exception as e:
-    sys.exit("ERROR: " + str(e))
\ No newline at end of file
+    sys.exit("ERROR: " + str(e))
@@ -0,0 +1,170 @@
+"""Module for evaluation of compiled expressions over large arrays.
+
+Requires numpy, which is an optional dependency.
+"""
+import math
+import operator
+
+from pycalc.data.tokens import TokenType
+
+# Count of array elements calculated at once, block of float64 values fits into L1/L2 cache.
+DEFAULT_BLOCK_SIZE = 4096
+# Names of numpy ufuncs for operations from SUPPORTED_OPERATIONS.
+OPERATION_UFUNCS = {
+    "+": "add", "-": "subtract",
+    "*": "multiply", "/": "true_divide", "//": "floor_divide", "%": "remainder",
+    "^": "power",
+    "<": "less", "<=": "less_equal", "==": "equal", "!=": "not_equal", ">=": "greater_equal", ">": "greater"
+}
+# Functions and names of numpy ufuncs with the same results for float arguments and their arguments count.
+# Other functions, for example math.remainder which is not numpy.remainder, are called for every element.
+FUNCTION_UFUNCS = {
+    math.sin: ("sin", 1), math.cos: ("cos", 1), math.tan: ("tan", 1),
+    math.asin: ("arcsin", 1), math.acos: ("arccos", 1), math.atan: ("arctan", 1), math.atan2: ("arctan2", 2),
+    math.sinh: ("sinh", 1), math.cosh: ("cosh", 1), math.tanh: ("tanh", 1),
+    math.asinh: ("arcsinh", 1), math.acosh: ("arccosh", 1), math.atanh: ("arctanh", 1),
+    math.exp: ("exp", 1), math.expm1: ("expm1", 1), math.log: ("log", 1), math.log2: ("log2", 1),
+    math.log10: ("log10", 1), math.log1p: ("log1p", 1), math.sqrt: ("sqrt", 1), math.pow: ("power", 2),
+    math.hypot: ("hypot", 2), math.fabs: ("fabs", 1), math.fmod: ("fmod", 2), math.copysign: ("copysign", 2),
+    math.floor: ("floor", 1), math.ceil: ("ceil", 1), math.trunc: ("trunc", 1),
+    math.degrees: ("degrees", 1), math.radians: ("radians", 1),
+    abs: ("absolute", 1), round: ("rint", 1), operator.not_: ("logical_not", 1)
+}
+
+
+def evaluate_blocked(expression, arrays, block_size=DEFAULT_BLOCK_SIZE, out=None):
+    """Evaluates expression for every element of input arrays.
+
+    Arrays are processed by blocks: the whole program is calculated for one block before the next one, and
+    intermediate results are written to scratch buffers which are reused for every block. So memory used for
+    intermediate results depends on block size and stack depth of the program, but not on size of arrays.
+
+    Operations and functions from FUNCTION_UFUNCS are calculated by numpy ufuncs with numpy semantics (for
+    example, division by zero returns inf), other functions are called for every element. Values are calculated
+    as float64, inputs of other types are converted block by block.
+
+    Args:
+        expression: compiled expression without conditional functions
+        arrays: dictionary with one-dimensional arrays or numbers for every variable of expression
+        block_size: count of elements calculated at once
+        out: optional array to write result to
+
+    Returns:
+        array with result for every element
+
+    Raises:
+        ImportError: if numpy is not installed
+        ValueError: if expression contains conditional functions or arrays have different length
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is required for array evaluation")
+    if block_size < 1:
+        raise ValueError("Block size has to be positive")
+    program = expression.program
+    if any(token.is_jump() for token in program):
+        raise ValueError("Conditional functions are not supported in array evaluation")
+    inputs, size = __prepare_inputs(numpy, expression, arrays)
+    block_length = min(block_size, max(size, 1))
+    input_buffers = {name: numpy.empty(block_length) for name, value in inputs.items()
+                     if isinstance(value, numpy.ndarray) and value.dtype != numpy.float64}
+    if out is None:
+        out = numpy.empty(size)
+    elif out.shape != (size,):
+        raise ValueError("Output array has to have length " + str(size))
+    operations = [__ufunc(numpy, token) for token in program]
+    buffers = numpy.empty((__stack_depth(program), block_length))
+    for start in range(0, size, block_size):
+        stop = min(start + block_size, size)
+        stack = []
+        for token, ufunc in zip(program, operations):
+            if token.type == TokenType.VARIABLE:
+                stack.append(__input_block(numpy, inputs[token.name], input_buffers.get(token.name), start, stop))
+                continue
+            if token.is_number():
+                stack.append(token.value)
+                continue
+            args_start = len(stack) - (token.param_count if token.is_function() else 2)
+            args = stack[args_start:]
+            del stack[args_start:]
+            if not any(isinstance(arg, numpy.ndarray) for arg in args):
+                stack.append(token.apply(tuple(args)))
+                continue
+            target = buffers[args_start, :stop - start]
+            if ufunc is not None:
+                ufunc(*args, out=target)
+            else:
+                function = numpy.frompyfunc(lambda *values: token.apply(values), len(args), 1)
+                numpy.copyto(target, function(*args), casting="unsafe")
+            stack.append(target)
+        out[start:stop] = stack[0]
+    return out
+
+
+def __prepare_inputs(numpy, expression, arrays):
+    """Converts inputs to arrays and checks their length.
+
+    Numpy arrays are used as is, inputs of other types than float64 are converted by blocks during evaluation.
+
+    Returns:
+        tuple of dictionary with inputs and length of arrays
+    """
+    inputs, size = {}, None
+    for name in expression.variables:
+        if name not in arrays:
+            raise ValueError("Missing value for variable: " + name)
+        value = numpy.asarray(arrays[name])
+        if value.ndim == 0:
+            inputs[name] = float(value)
+            continue
+        if value.ndim != 1 or (size is not None and len(value) != size):
+            raise ValueError("Arrays have to be one-dimensional and have the same length")
+        inputs[name] = value
+        size = len(value)
+    return inputs, 1 if size is None else size
+
+
+def __input_block(numpy, value, buffer, start, stop):
+    """Returns block of input as float64 array, converted block is written to buffer.
+
+    Args:
+        value: input array or number
+        buffer: buffer for converted block or None if input does not have to be converted
+        start: index of first element of block
+        stop: index after last element of block
+
+    Returns:
+        block of input or number
+    """
+    if not isinstance(value, numpy.ndarray):
+        return value
+    if buffer is None:
+        return value[start:stop]
+    block = buffer[:stop - start]
+    numpy.copyto(block, value[start:stop], casting="unsafe")
+    return block
+
+
+def __ufunc(numpy, token):
+    """Returns numpy ufunc that calculates token or None if there is no such ufunc."""
+    if token.is_number():
+        return None
+    if token.is_operation():
+        return getattr(numpy, OPERATION_UFUNCS[token.operation])
+    name, param_count = FUNCTION_UFUNCS.get(token.function, (None, None))
+    if param_count != token.param_count:
+        return None
+    return getattr(numpy, name)
+
+
+def __stack_depth(program):
+    """Returns maximal count of values in the stack during program calculation."""
+    depth, max_depth = 0, 1
+    for token in program:
+        if token.is_number():
+            depth += 1
+        else:
+            depth -= (token.param_count if token.is_function() else 2) - 1
+        max_depth = max(max_depth, depth)
+    return max_depth
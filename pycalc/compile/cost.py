@@ -0,0 +1,237 @@
+"""Module with static estimation of expression evaluation cost."""
+import math
+
+from pycalc.compile.tree import NumberNode, OperationNode, CallNode, ConditionalNode, build_tree, transform
+from pycalc.data.tokens import TokenType, ConditionalToken
+from pycalc.parse import parser_utils
+from pycalc.parse.parser import Parser
+from pycalc.pycalc import reverse_polish_notation
+
+# Relative cost of operations from SUPPORTED_OPERATIONS.
+OPERATION_COSTS = {
+    "+": 1, "-": 1,
+    "*": 1, "/": 2, "//": 2, "%": 2,
+    "^": 4,
+    "<": 1, "<=": 1, "==": 1, "!=": 1, ">=": 1, ">": 1
+}
+# Relative cost of number, constant or variable.
+OPERAND_COST = 1
+# Relative cost of function without cost hint.
+DEFAULT_FUNCTION_COST = 10
+# Cost hints of functions that are much cheaper or much more expensive than default.
+FUNCTION_COSTS = {
+    abs: 2, round: 2, math.fabs: 2, math.floor: 2, math.ceil: 2, math.trunc: 2, math.sqrt: 3,
+    math.factorial: 100, math.comb: 100, math.perm: 100, math.gcd: 20, math.lcm: 20
+}
+# Size in bits of number that is calculated in one step.
+WORD_BITS = 64
+# Additional cost of power which exponent size is unknown or of big integer function which argument size is
+# unknown, it can be a long big integer calculation.
+UNKNOWN_POWER_COST = 100
+# Size of value that is not an integer, its power is calculated in one step.
+__INEXACT = "inexact"
+
+
+def estimate_cost(tokens, function_costs=None):
+    """Estimates cost of expression evaluation from validated list of tokens.
+
+    Cost is sum of costs of operands, operations and functions. Power, multiplication and big integer
+    functions (factorial, comb, perm) are also estimated by size of their integer results, as big integer
+    calculations take much longer than other operations. Sizes of integer values are estimated over expression
+    tree, so literals inside braces and nested calculations are taken into account, and power or big integer
+    function with argument of unknown size is considered expensive. Every level of nesting adds cost of keeping intermediate
+    results.
+
+    Args:
+        tokens: validated list of tokens in direct order, see Parser.parse_tokens
+        function_costs: dictionary with cost hints of functions, overwrites FUNCTION_COSTS
+
+    Returns:
+        relative cost of expression evaluation
+    """
+    hints = dict(FUNCTION_COSTS)
+    hints.update(function_costs or {})
+    cost, depth = 0, 0
+    for token in tokens:
+        if token.type == TokenType.OPEN_BRACE:
+            depth += 1
+            cost += depth
+        elif token.type == TokenType.CLOSE_BRACE:
+            depth -= 1
+        elif token.is_number():
+            cost += OPERAND_COST
+        elif isinstance(token, ConditionalToken):
+            cost += token.param_count
+        elif token.is_function():
+            cost += hints.get(token.function, DEFAULT_FUNCTION_COST)
+        elif token.is_operation():
+            cost += OPERATION_COSTS.get(token.operation, 1)
+    if len(tokens) > 0:
+        cost += transform(build_tree(reverse_polish_notation(tokens)), __estimate_node)[1]
+    return cost
+
+
+def __estimate_node(node, children):
+    """Estimates size of node value and additional cost of big integer calculations in node subtree.
+
+    Size of integer value is log2(abs(value)) or 0 for 0, size of other numbers is __INEXACT and size of values that
+    can not be estimated statically is None.
+
+    Args:
+        node: node of expression tree
+        children: sizes and costs of child nodes
+
+    Returns:
+        tuple of value size and additional cost of big integer calculations
+    """
+    sizes = [size for size, _ in children]
+    cost = sum(child_cost for _, child_cost in children)
+    if isinstance(node, NumberNode):
+        if isinstance(node.value, int):
+            return integer_size(node.value), 0
+        return __INEXACT, 0
+    if isinstance(node, ConditionalNode):
+        values = sizes[1:] if node.function == "if" else sizes
+        if all(size == __INEXACT for size in values):
+            return __INEXACT, cost
+        if any(size is None or size == __INEXACT for size in values):
+            return None, cost
+        return max(values), cost
+    if isinstance(node, CallNode) and node.function in INTEGER_FUNCTION_SIZES:
+        if any(size is None for size in sizes):
+            return None, cost + UNKNOWN_POWER_COST
+        if any(size == __INEXACT for size in sizes):
+            return None, cost
+        size = INTEGER_FUNCTION_SIZES[node.function](*sizes)
+        return size, cost + size / WORD_BITS
+    if not isinstance(node, OperationNode):
+        return None, cost
+    if node.operation in parser_utils.COMPARISON_OPERATIONS:
+        return 1, cost
+    left, right = sizes
+    if node.operation == "^":
+        cost += __power_cost(left, right)
+    if left == __INEXACT or right == __INEXACT or node.operation == "/":
+        return __INEXACT, cost
+    if left is None or right is None:
+        return None, cost
+    if node.operation == "*":
+        return left + right, cost + ((left + right) / WORD_BITS if left + right > WORD_BITS else 0)
+    if node.operation == "//":
+        return left, cost
+    if node.operation == "%":
+        return right, cost
+    if node.operation == "^":
+        return power_size(left, right), cost
+    return max(left, right) + 1, cost
+
+
+def integer_size(value):
+    """Returns size of integer value in bits: log2(abs(value)) or 0 for 0."""
+    return math.log2(max(abs(value), 1))
+
+
+def power_size(base, exponent):
+    """Returns size of integer power in bits by sizes of integer base and exponent, see integer_size."""
+    if base == 0:
+        return 0
+    return base * __exp2(exponent)
+
+
+def __exp2(size):
+    """Returns estimated integer value by its size."""
+    return 2 ** size if size < 1024 else math.inf
+
+
+def __factorial_size(number):
+    """Returns size of factorial by size of its argument."""
+    return number * __exp2(number)
+
+
+def __combinations_size(number, count=None):
+    """Returns size of count of combinations or permutations by sizes of their arguments."""
+    if count is None or count > number:
+        return __factorial_size(number)
+    return number * __exp2(count) if number > 0 else 0
+
+
+# Functions which results are big integers and functions to estimate size of their result by sizes of arguments.
+INTEGER_FUNCTION_SIZES = {
+    math.factorial: __factorial_size,
+    math.comb: __combinations_size,
+    math.perm: __combinations_size
+}
+
+
+def __power_cost(base, exponent):
+    """Estimates additional cost of power by sizes of its arguments.
+
+    Args:
+        base: size of base
+        exponent: size of exponent
+
+    Returns:
+        additional cost of power
+    """
+    if exponent is None:
+        return UNKNOWN_POWER_COST
+    if exponent == __INEXACT:
+        return 0
+    if base is None or base == __INEXACT:
+        return exponent
+    return power_size(base, exponent) / WORD_BITS
+
+
+def expression_cost(expression, environment, variables=(), function_costs=None):
+    """Parses expression and estimates cost of its evaluation.
+
+    Args:
+        expression: string expression
+        environment: environment with constants and functions
+        variables: names of variables which values are provided on evaluation
+        function_costs: dictionary with cost hints of functions
+
+    Returns:
+        relative cost of expression evaluation
+    """
+    tokens = Parser(expression, environment.constants, environment.functions, variables).parse_tokens()
+    return estimate_cost(tokens, function_costs)
+
+
+def check_cost(tokens, max_cost, function_costs=None):
+    """Checks that cost of expression does not exceed budget, so it can be evaluated.
+
+    Args:
+        tokens: validated list of tokens in direct order
+        max_cost: maximal allowed cost
+        function_costs: dictionary with cost hints of functions
+
+    Raises:
+        ValueError: if cost exceeds budget
+    """
+    cost = estimate_cost(tokens, function_costs)
+    if cost > max_cost:
+        raise ValueError("Expression cost {0:g} exceeds budget {1:g}".format(cost, max_cost))
+
+
+def longest_first(expressions, environment, variables=(), function_costs=None):
+    """Orders expressions by estimated cost from the most expensive to the cheapest.
+
+    Expressions that can not be parsed are considered the cheapest, they fail fast on evaluation.
+
+    Args:
+        expressions: list of string expressions
+        environment: environment with constants and functions
+        variables: names of variables which values are provided on evaluation
+        function_costs: dictionary with cost hints of functions
+
+    Returns:
+        list of expressions indices
+    """
+    costs = []
+    for expression in expressions:
+        try:
+            costs.append(expression_cost(expression, environment, variables, function_costs))
+        except ValueError:
+            costs.append(0)
+    return sorted(range(len(expressions)), key=lambda index: -costs[index])
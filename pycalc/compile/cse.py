@@ -0,0 +1,191 @@
+"""Module with common subexpression elimination for one expression and for batch of expressions."""
+import math
+
+from pycalc.compile.tree import (NumberNode, VariableNode, OperationNode, CallNode, ConditionalNode, build_tree,
+                                 transform)
+from pycalc.data.tokens import FunctionToken, OperationToken
+from pycalc.pycalc import BUILTIN_FUNCTIONS
+
+# Marker of node value that is not calculated yet.
+NOT_CALCULATED = object()
+
+
+def is_pure_function(function, pure_functions=()):
+    """Determines whether function always returns the same result for the same arguments and has no side effects.
+
+    Args:
+        function: function to check
+        pure_functions: additional functions that are known to be pure
+
+    Returns:
+        True for functions from math module, builtin functions and given pure functions
+    """
+    name = getattr(function, "__name__", None)
+    return (function in pure_functions or function in BUILTIN_FUNCTIONS.values() or
+            (name is not None and getattr(math, name, None) is function))
+
+
+class ExpressionBatch:
+    """Several compiled expressions which share common subexpressions.
+
+    Expressions are converted to one directed acyclic graph, where every distinct pure subexpression is
+    represented by one node, so it is calculated once per evaluation even if it is used several times in one
+    expression or in different expressions. Calls of functions that are not pure are never shared.
+
+    Attributes:
+        sources: original string expressions
+        variables: names of variables which values have to be provided on evaluation
+        node_count: count of distinct nodes in graph
+    """
+    def __init__(self, expressions, pure_functions=()):
+        self.__sources = tuple(expression.source for expression in expressions)
+        self.__variables = tuple(sorted({name for expression in expressions for name in expression.variables}))
+        self.__pure_functions = tuple(pure_functions)
+        self.__nodes = []
+        self.__indices = {}
+        self.__roots = tuple(transform(build_tree(expression.program), self.__add_node)[0]
+                             for expression in expressions)
+        self.__eager = self.__find_eager_nodes()
+
+    def __repr__(self):
+        return "ExpressionBatch" + repr(self.__sources)
+
+    @property
+    def sources(self):
+        return self.__sources
+
+    @property
+    def variables(self):
+        return self.__variables
+
+    @property
+    def node_count(self):
+        return len(self.__nodes)
+
+    def evaluate(self, **values):
+        """Evaluates all expressions in one pass.
+
+        Args:
+            values: values of expressions variables
+
+        Returns:
+            list with result of every expression
+
+        Raises:
+            errors of calculation of any expression, as all expressions are calculated together
+        """
+        results = [NOT_CALCULATED] * len(self.__nodes)
+        for index in self.__eager:
+            results[index] = self.__calculate(index, results, values)
+        return [results[index] for index in self.__roots]
+
+    def __add_node(self, node, children):
+        """Adds node to graph after its children, reuses existing node for the same pure subexpression.
+
+        Args:
+            node: node of expression tree
+            children: tuples of index in graph and flag whether node is pure for every child of node
+
+        Returns:
+            tuple of index of node in graph and flag whether node is pure
+        """
+        child_indices = tuple(index for index, _ in children)
+        if isinstance(node, NumberNode):
+            operation, key = node.value, node.key
+        elif isinstance(node, VariableNode):
+            operation, key = node.name, node.key
+        elif isinstance(node, OperationNode):
+            operation, key = OperationToken(node.operation), ("operation", node.operation)
+        elif isinstance(node, CallNode):
+            operation, key = FunctionToken(node.function, len(children)), ("call", node.function)
+        else:
+            operation, key = node.function, ("conditional", node.function)
+        key = (key, child_indices)
+        is_pure = all(is_child_pure for _, is_child_pure in children) and (
+            not isinstance(node, CallNode) or is_pure_function(node.function, self.__pure_functions))
+        if is_pure and key in self.__indices:
+            return self.__indices[key], True
+        self.__nodes.append((type(node), operation, child_indices))
+        if is_pure:
+            self.__indices[key] = len(self.__nodes) - 1
+        return len(self.__nodes) - 1, is_pure
+
+    def __find_eager_nodes(self):
+        """Finds nodes that are always calculated: roots and their children except lazy arguments of conditions.
+
+        Returns:
+            indices of eager nodes in calculation order
+        """
+        is_eager = [False] * len(self.__nodes)
+        for index in self.__roots:
+            is_eager[index] = True
+        for index in reversed(range(len(self.__nodes))):
+            node_type, _, children = self.__nodes[index]
+            if is_eager[index]:
+                for child in children[:1] if node_type is ConditionalNode else children:
+                    is_eager[child] = True
+        return tuple(index for index in range(len(self.__nodes)) if is_eager[index])
+
+    def __calculate(self, index, results, values):
+        """Calculates node, its lazy children are calculated on demand.
+
+        Args:
+            index: index of node in graph
+            results: calculated values of nodes
+            values: values of variables
+
+        Returns:
+            value of node
+        """
+        node_type, operation, children = self.__nodes[index]
+        if node_type is NumberNode:
+            return operation
+        if node_type is VariableNode:
+            if operation not in values:
+                raise ValueError("Missing value for variable: " + operation)
+            return values[operation]
+        if node_type is OperationNode or node_type is CallNode:
+            return operation.apply(tuple(results[child] for child in children))
+        condition = results[children[0]]
+        if operation == "if":
+            return self.__lazy_value(children[1] if condition else children[2], results, values)
+        for child in children[1:]:
+            if bool(condition) == (operation == "or"):
+                return condition
+            condition = self.__lazy_value(child, results, values)
+        return condition
+
+    def __lazy_value(self, index, results, values):
+        """Returns value of node, calculates it with its children if it is not calculated yet.
+
+        Children are calculated before their parents without recursion, only calculation of lazy arguments of
+        nested conditions goes deeper.
+        """
+        stack = [index]
+        while len(stack) > 0:
+            current = stack[-1]
+            if results[current] is not NOT_CALCULATED:
+                stack.pop()
+                continue
+            node_type, _, children = self.__nodes[current]
+            missing = [child for child in (children[:1] if node_type is ConditionalNode else children)
+                       if results[child] is NOT_CALCULATED]
+            if len(missing) > 0:
+                stack.extend(missing)
+            else:
+                stack.pop()
+                results[current] = self.__calculate(current, results, values)
+        return results[index]
+
+
+def compile_batch(expressions, pure_functions=()):
+    """Combines compiled expressions to batch with shared common subexpressions.
+
+    Args:
+        expressions: compiled expressions
+        pure_functions: additional functions that can be shared, see is_pure_function
+
+    Returns:
+        batch of expressions
+    """
+    return ExpressionBatch(expressions, pure_functions)
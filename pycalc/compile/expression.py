@@ -0,0 +1,120 @@
+"""Module with compiled expressions and environments that can be shared between threads."""
+from types import MappingProxyType
+
+from pycalc.compile.cost import check_cost
+from pycalc.compile.gradient import gradient
+from pycalc.parse.parser import Parser
+from pycalc.pycalc import BUILTIN_FUNCTIONS, load, reverse_polish_notation, calculate
+
+
+class Environment:
+    """Read-only set of constants and functions loaded from modules.
+
+    Environment is loaded once and never changes after creation, so it can be shared between threads.
+
+    Attributes:
+        modules: names of loaded modules, "math" module is always loaded first
+        constants: read-only dictionary with all loaded constants
+        functions: read-only dictionary with all loaded functions
+    """
+    def __init__(self, modules=()):
+        self.__modules = ("math",) + tuple(modules)
+        constants_dict = {}
+        functions_dict = dict(BUILTIN_FUNCTIONS)
+        for module in self.__modules:
+            load(module, constants_dict, functions_dict)
+        self.__constants = MappingProxyType(constants_dict)
+        self.__functions = MappingProxyType(functions_dict)
+
+    def __repr__(self):
+        return "Environment" + str(self.__modules)
+
+    @property
+    def modules(self):
+        return self.__modules
+
+    @property
+    def constants(self):
+        return self.__constants
+
+    @property
+    def functions(self):
+        return self.__functions
+
+
+class Expression:
+    """Compiled expression.
+
+    Expression keeps its program in reverse polish notation as a tuple and never changes it on evaluation,
+    so one compiled expression can be evaluated from several threads at the same time.
+
+    Attributes:
+        source: original string expression
+        program: tuple of tokens in reverse polish notation
+        variables: names of variables which values have to be provided on evaluation
+    """
+    def __init__(self, source, program, variables=()):
+        self.__source = source
+        self.__program = tuple(program)
+        self.__variables = tuple(variables)
+
+    def __repr__(self):
+        return "Expression(" + repr(self.__source) + ")"
+
+    @property
+    def source(self):
+        return self.__source
+
+    @property
+    def program(self):
+        return self.__program
+
+    @property
+    def variables(self):
+        return self.__variables
+
+    def evaluate(self, **values):
+        """Evaluates expression.
+
+        Args:
+            values: values of expression variables
+
+        Returns:
+            result of expression evaluation
+        """
+        return calculate(self.__program, values)
+
+    def gradient(self, vars=None, **values):
+        """Calculates value of expression and its partial derivatives in one pass.
+
+        Args:
+            vars: names of variables to differentiate by, all expression variables by default
+            values: values of expression variables
+
+        Returns:
+            tuple of expression value and dictionary with partial derivative for every variable
+        """
+        return gradient(self.__program, values, self.__variables if vars is None else vars)
+
+
+def compile_expression(expression, environment, variables=(), max_cost=None, function_costs=None):
+    """Parses expression and compiles it to reverse polish notation.
+
+    Args:
+        expression: expression to compile
+        environment: environment with constants and functions
+        variables: names of variables which values are provided on evaluation
+        max_cost: maximal estimated cost of expression evaluation, see estimate_cost
+        function_costs: dictionary with cost hints of functions
+
+    Returns:
+        compiled expression
+
+    Raises:
+        ValueError: if expression is not valid or its cost exceeds max_cost
+    """
+    variables = tuple(variables)
+    tokens = Parser(expression, environment.constants, environment.functions, variables).parse_tokens()
+    if max_cost is not None:
+        check_cost(tokens, max_cost, function_costs)
+    return Expression(expression, reverse_polish_notation(tokens), variables)
@@ -0,0 +1,293 @@
+"""Module for forward-mode automatic differentiation of compiled expressions."""
+import math
+import operator
+
+from pycalc.data.tokens import FunctionToken
+from pycalc.pycalc import calculate
+
+
+class Dual:
+    """Dual number: value with its partial derivatives with respect to several variables.
+
+    Operations with dual numbers calculate value and all partial derivatives at once. Comparisons and conversion
+    to boolean use only value.
+
+    Attributes:
+        value: number value
+        partials: tuple of partial derivatives
+    """
+    __slots__ = ("value", "partials")
+
+    def __init__(self, value, partials):
+        self.value = value
+        self.partials = tuple(partials)
+
+    def __repr__(self):
+        return "Dual(" + repr(self.value) + ", " + repr(self.partials) + ")"
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __add__(self, other):
+        return combine(self, other, self.value_of(self) + self.value_of(other), 1, 1)
+
+    def __radd__(self, other):
+        return combine(other, self, self.value_of(other) + self.value, 1, 1)
+
+    def __sub__(self, other):
+        return combine(self, other, self.value - self.value_of(other), 1, -1)
+
+    def __rsub__(self, other):
+        return combine(other, self, self.value_of(other) - self.value, 1, -1)
+
+    def __mul__(self, other):
+        return multiply(self, other)
+
+    def __rmul__(self, other):
+        return multiply(other, self)
+
+    def __truediv__(self, other):
+        return divide(self, other)
+
+    def __rtruediv__(self, other):
+        return divide(other, self)
+
+    def __floordiv__(self, other):
+        return self.value_of(self) // self.value_of(other)
+
+    def __rfloordiv__(self, other):
+        return self.value_of(other) // self.value
+
+    def __mod__(self, other):
+        return modulo(self, other)
+
+    def __rmod__(self, other):
+        return modulo(other, self)
+
+    def __pow__(self, other):
+        return power(self, other)
+
+    def __rpow__(self, other):
+        return power(other, self)
+
+    def __lt__(self, other):
+        return self.value < self.value_of(other)
+
+    def __le__(self, other):
+        return self.value <= self.value_of(other)
+
+    def __eq__(self, other):
+        return self.value == self.value_of(other)
+
+    def __ne__(self, other):
+        return self.value != self.value_of(other)
+
+    def __ge__(self, other):
+        return self.value >= self.value_of(other)
+
+    def __gt__(self, other):
+        return self.value > self.value_of(other)
+
+    __hash__ = None
+
+    @staticmethod
+    def value_of(number):
+        """Returns value of dual or plain number."""
+        return number.value if isinstance(number, Dual) else number
+
+
+def combine(first, second, value, first_derivative, second_derivative):
+    """Creates dual number from result of binary operation using chain rule.
+
+    Args:
+        first: first argument, dual or plain number
+        second: second argument, dual or plain number
+        value: value of operation result
+        first_derivative: derivative of operation with respect to the first argument
+        second_derivative: derivative of operation with respect to the second argument
+
+    Returns:
+        dual number
+    """
+    if not isinstance(first, Dual):
+        return Dual(value, (second_derivative * partial for partial in second.partials))
+    if not isinstance(second, Dual):
+        return Dual(value, (first_derivative * partial for partial in first.partials))
+    return Dual(value, (first_derivative * first_partial + second_derivative * second_partial
+                        for first_partial, second_partial in zip(first.partials, second.partials)))
+
+
+def multiply(first, second):
+    """Multiplies dual or plain numbers."""
+    first_value, second_value = Dual.value_of(first), Dual.value_of(second)
+    return combine(first, second, first_value * second_value, second_value, first_value)
+
+
+def divide(first, second):
+    """Divides dual or plain numbers."""
+    first_value, second_value = Dual.value_of(first), Dual.value_of(second)
+    value = first_value / second_value
+    return combine(first, second, value, 1 / second_value, -value / second_value)
+
+
+def modulo(first, second):
+    """Calculates remainder of division of dual or plain numbers."""
+    first_value, second_value = Dual.value_of(first), Dual.value_of(second)
+    return combine(first, second, first_value % second_value, 1, -(first_value // second_value))
+
+
+def power(base, exponent):
+    """Raises dual or plain number to the power, derivatives are calculated only for dual arguments."""
+    base_value, exponent_value = Dual.value_of(base), Dual.value_of(exponent)
+    value = base_value ** exponent_value
+    base_derivative = power_partial(0, base_value, exponent_value) if isinstance(base, Dual) else 0
+    exponent_derivative = power_partial(1, base_value, exponent_value) if isinstance(exponent, Dual) else 0
+    return combine(base, exponent, value, base_derivative, exponent_derivative)
+
+
+def power_partial(index, base, exponent):
+    """Returns derivative of power with respect to base (index 0) or exponent (index 1).
+
+    Derivative with respect to exponent is not defined for negative base.
+
+    Raises:
+        ValueError: for derivative with respect to exponent of negative base
+    """
+    if index == 0:
+        return 0 if exponent == 0 else exponent * base ** (exponent - 1)
+    if base < 0:
+        raise ValueError("math domain error")
+    return 0 if base == 0 else base ** exponent * math.log(base)
+
+
+def __sign(x):
+    """Returns sign of number: -1, 0 or 1."""
+    return (x > 0) - (x < 0)
+
+
+def __log(index, x, base=math.e):
+    """Returns derivative of logarithm with respect to number (index 0) or base (index 1)."""
+    if index == 0:
+        return 1 / (x * math.log(base))
+    return -math.log(x) / (base * math.log(base) ** 2)
+
+
+def __hypot(index, *args):
+    """Returns derivative of hypot with respect to argument with given index."""
+    value = math.hypot(*args)
+    return args[index] / value if value else 0
+
+
+# Derivatives of functions: function receives index of argument and values of all arguments and returns
+# derivative with respect to this argument. It is called only for arguments that are dual numbers.
+DERIVATIVES = {
+    math.sin: lambda i, x: math.cos(x),
+    math.cos: lambda i, x: -math.sin(x),
+    math.tan: lambda i, x: 1 / math.cos(x) ** 2,
+    math.asin: lambda i, x: 1 / math.sqrt(1 - x * x),
+    math.acos: lambda i, x: -1 / math.sqrt(1 - x * x),
+    math.atan: lambda i, x: 1 / (1 + x * x),
+    math.atan2: lambda i, y, x: (x if i == 0 else -y) / (x * x + y * y),
+    math.sinh: lambda i, x: math.cosh(x),
+    math.cosh: lambda i, x: math.sinh(x),
+    math.tanh: lambda i, x: 1 / math.cosh(x) ** 2,
+    math.asinh: lambda i, x: 1 / math.sqrt(x * x + 1),
+    math.acosh: lambda i, x: 1 / math.sqrt(x * x - 1),
+    math.atanh: lambda i, x: 1 / (1 - x * x),
+    math.exp: lambda i, x: math.exp(x),
+    math.expm1: lambda i, x: math.exp(x),
+    math.log: __log,
+    math.log2: lambda i, x: 1 / (x * math.log(2)),
+    math.log10: lambda i, x: 1 / (x * math.log(10)),
+    math.log1p: lambda i, x: 1 / (1 + x),
+    math.sqrt: lambda i, x: 0.5 / math.sqrt(x),
+    math.pow: power_partial,
+    math.hypot: __hypot,
+    math.fabs: lambda i, x: __sign(x),
+    math.copysign: lambda i, x, y: __sign(x) * math.copysign(1, y) if i == 0 and x else 0,
+    math.fmod: lambda i, x, y: 1 if i == 0 else -math.trunc(x / y),
+    math.remainder: lambda i, x, y: 1 if i == 0 else -round(x / y),
+    math.ldexp: lambda i, x, exponent: math.ldexp(1.0, exponent) if i == 0 else 0,
+    math.degrees: lambda i, x: 180 / math.pi,
+    math.radians: lambda i, x: math.pi / 180,
+    math.erf: lambda i, x: 2 / math.sqrt(math.pi) * math.exp(-x * x),
+    math.erfc: lambda i, x: -2 / math.sqrt(math.pi) * math.exp(-x * x),
+    math.ceil: lambda i, x: 0,
+    math.floor: lambda i, x: 0,
+    math.trunc: lambda i, x: 0,
+    math.isnan: lambda i, x: 0,
+    math.isinf: lambda i, x: 0,
+    math.isfinite: lambda i, x: 0,
+    math.isclose: lambda i, *args: 0,
+    abs: lambda i, x: __sign(x),
+    round: lambda i, x, digits=None: 0,
+    operator.not_: lambda i, x: 0,
+}
+if hasattr(math, "cbrt"):
+    DERIVATIVES[math.cbrt] = lambda i, x: 1 / (3 * math.cbrt(x) ** 2)
+if hasattr(math, "exp2"):
+    DERIVATIVES[math.exp2] = lambda i, x: math.exp2(x) * math.log(2)
+
+
+def differentiable(function):
+    """Creates version of function that accepts dual numbers.
+
+    Function without derivative in DERIVATIVES can be used only if it returns boolean or integer value, which is
+    considered constant.
+
+    Args:
+        function: function with derivative in DERIVATIVES
+
+    Returns:
+        function that calculates value and partial derivatives when some arguments are dual numbers
+    """
+    derivative = DERIVATIVES.get(function)
+
+    def differentiable_function(*args):
+        if not any(isinstance(arg, Dual) for arg in args):
+            return function(*args)
+        values = tuple(Dual.value_of(arg) for arg in args)
+        value = function(*values)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return value
+        if derivative is None:
+            if not isinstance(value, float):
+                return value
+            raise ValueError("No derivative rule for function: " + getattr(function, "__name__", str(function)))
+        partials = [0] * len(next(arg.partials for arg in args if isinstance(arg, Dual)))
+        for index, arg in enumerate(args):
+            arg_derivative = derivative(index, *values) if isinstance(arg, Dual) else 0
+            if arg_derivative:
+                partials = [partial + arg_derivative * arg_partial
+                            for partial, arg_partial in zip(partials, arg.partials)]
+        return Dual(value, partials)
+
+    return differentiable_function
+
+
+def gradient(program, values, names):
+    """Calculates value of expression and its partial derivatives in one pass.
+
+    Args:
+        program: tokens in reverse polish notation
+        values: dictionary with values of variables
+        names: names of variables to differentiate by
+
+    Returns:
+        tuple of expression value and dictionary with partial derivative for every name
+
+    Raises:
+        ValueError: if some function has no derivative rule
+    """
+    names = tuple(names)
+    dual_values = dict(values)
+    for index, name in enumerate(names):
+        if name not in values:
+            raise ValueError("Missing value for variable: " + name)
+        dual_values[name] = Dual(values[name], (1 if i == index else 0 for i in range(len(names))))
+    dual_program = [FunctionToken(differentiable(token.function), token.param_count) if token.is_function()
+                    else token for token in program]
+    result = calculate(dual_program, dual_values)
+    if not isinstance(result, Dual):
+        return result, {name: 0 for name in names}
+    return result.value, dict(zip(names, result.partials))
@@ -0,0 +1,276 @@
+"""Module with algebraic simplification of compiled expressions."""
+import math
+
+from pycalc.compile.cost import integer_size, power_size
+from pycalc.compile.expression import Expression
+from pycalc.compile.tree import NumberNode, OperationNode, ConditionalNode, build_tree, build_program, transform
+from pycalc.data.tokens import OperationToken
+from pycalc.parse.parser_utils import COMPARISON_OPERATIONS
+
+# Maximal power that is replaced by multiplication chain.
+MAX_EXPANDED_POWER = 4
+# Maximal estimated size in bits of integer power that is calculated on optimization.
+MAX_FOLDED_POWER_BITS = 65536
+
+
+def optimize(expression, strict=True, variable_types=None):
+    """Simplifies compiled expression.
+
+    Applied rewrites: folding of operations with constant arguments (except ones in lazily calculated
+    arguments of conditional functions and too big integer powers), removal of identity operations (x*1, x+0,
+    x-0), replacement of division by constant with multiplication by its reciprocal, replacement of small
+    integer powers with multiplication chain and of long multiplication chains with power.
+
+    In strict mode rewrite is applied only if it never changes result of evaluation, including its type and
+    raised errors, so most rewrites require known types of variables.
+
+    Args:
+        expression: compiled expression
+        strict: apply only rewrites that keep exact result
+        variable_types: dictionary with types (int, float or bool) of variables values
+
+    Returns:
+        new compiled expression, or the same expression if it is too deeply nested to be rebuilt
+    """
+    optimizer = Optimizer(strict, variable_types or {})
+    try:
+        tree = optimizer.simplify(build_tree(expression.program))
+    except RecursionError:
+        return expression
+    return Expression(expression.source, build_program(tree), expression.variables)
+
+
+class Optimizer:
+    """Rewrites expression tree bottom-up.
+
+    Attributes:
+        strict: apply only rewrites that keep exact result
+        variable_types: dictionary with types of variables values
+    """
+    def __init__(self, strict, variable_types):
+        self.strict = strict
+        self.variable_types = variable_types
+        self.__types = {}
+        self.__lazy_nodes = set()
+
+    def simplify(self, node):
+        """Simplifies node and all its children.
+
+        Args:
+            node: node of expression tree
+
+        Returns:
+            simplified node
+        """
+        self.__lazy_nodes = self.__find_lazy_nodes(node)
+        return transform(node, self.__simplify_node)
+
+    @staticmethod
+    def __find_lazy_nodes(node):
+        """Returns identifiers of nodes that are calculated only if condition of conditional function allows it."""
+        lazy_nodes = set()
+        stack = [(node, False)]
+        while len(stack) > 0:
+            current, is_lazy = stack.pop()
+            if is_lazy:
+                lazy_nodes.add(id(current))
+            for index, child in enumerate(current.children):
+                stack.append((child, is_lazy or (isinstance(current, ConditionalNode) and index > 0)))
+        return lazy_nodes
+
+    def value_type(self, node):
+        """Determines type of node value.
+
+        Types of simplified nodes are remembered, so type of node is found without walking its whole subtree.
+
+        Args:
+            node: node of expression tree
+
+        Returns:
+            int, float, bool or None if type is unknown
+        """
+        if node not in self.__types:
+            self.__types[node] = self.__find_type(node)
+        return self.__types[node]
+
+    def __simplify_node(self, node, children):
+        """Simplifies node which children are already simplified.
+
+        Args:
+            node: original node
+            children: simplified children of node
+
+        Returns:
+            simplified node
+        """
+        if node.is_leaf():
+            result = node
+        elif not isinstance(node, OperationNode):
+            result = type(node)(node.function, children)
+        else:
+            is_lazy = id(node) in self.__lazy_nodes
+            result = self.__simplify_operation(OperationNode(node.operation, *children), is_lazy)
+        self.value_type(result)
+        return result
+
+    def __find_type(self, node):
+        """Determines type of node value from types of its children."""
+        if isinstance(node, NumberNode):
+            return type(node.value) if type(node.value) in (int, float, bool) else None
+        if not node.is_leaf() and not isinstance(node, OperationNode):
+            return None
+        if node.is_leaf():
+            return self.variable_types.get(node.name)
+        if node.operation in COMPARISON_OPERATIONS:
+            return bool
+        types = {self.value_type(child) for child in node.children}
+        if None in types:
+            return None
+        if float in types or node.operation == "/":
+            return float
+        if node.operation == "^":
+            return None
+        return int
+
+    def __simplify_operation(self, node, is_lazy):
+        """Simplifies operation which children are already simplified.
+
+        Args:
+            node: operation node
+            is_lazy: True if node is calculated only if condition of conditional function allows it
+
+        Returns:
+            simplified node
+        """
+        left, right = node.children
+        if isinstance(left, NumberNode) and isinstance(right, NumberNode):
+            if is_lazy or self.__is_big_power(node):
+                return node
+            try:
+                return NumberNode(OperationToken(node.operation).apply((left.value, right.value)))
+            except (ArithmeticError, ValueError, TypeError, MemoryError):
+                return node
+        if node.operation == "*":
+            return self.__simplify_multiplication(node)
+        if node.operation in ("+", "-"):
+            return self.__simplify_sum(node)
+        if node.operation == "/":
+            return self.__simplify_division(node)
+        if node.operation == "^":
+            return self.__simplify_power(node)
+        return node
+
+    @staticmethod
+    def __is_big_power(node):
+        """Checks if node is power of integer numbers which result is too big to be calculated on optimization."""
+        base, exponent = (child.value for child in node.children)
+        return (node.operation == "^" and isinstance(base, int) and isinstance(exponent, int) and
+                power_size(integer_size(base), integer_size(exponent)) > MAX_FOLDED_POWER_BITS)
+
+    def __simplify_multiplication(self, node):
+        left, right = node.children
+        for value, other in ((right, left), (left, right)):
+            if self.__is_number(value, 1) and self.__keeps_type(other, value):
+                return other
+        power = self.__leaf_power(node)
+        if (power is not None and power[1] > MAX_EXPANDED_POWER and
+                (not self.strict or self.value_type(power[0]) == int)):
+            return OperationNode("^", power[0], NumberNode(power[1]))
+        return node
+
+    def __simplify_sum(self, node):
+        left, right = node.children
+        if self.__is_number(right, 0) and self.__keeps_type(left, right, node.operation == "+"):
+            return left
+        if node.operation == "+" and self.__is_number(left, 0) and self.__keeps_type(right, left, True):
+            return right
+        return node
+
+    def __simplify_division(self, node):
+        left, right = node.children
+        if not isinstance(right, NumberNode) or type(right.value) not in (int, float) or right.value == 0:
+            return node
+        if self.strict:
+            if type(right.value) != float or not math.isfinite(right.value):
+                return node
+            mantissa, _ = math.frexp(right.value)
+            reciprocal = 1 / right.value
+            if abs(mantissa) != 0.5 or reciprocal == 0 or not math.isfinite(reciprocal):
+                return node
+        else:
+            reciprocal = 1.0 / right.value
+        return OperationNode("*", left, NumberNode(reciprocal))
+
+    def __simplify_power(self, node):
+        base, power = node.children
+        if not isinstance(power, NumberNode) or type(power.value) != int or not base.is_leaf():
+            return node
+        if self.strict and self.value_type(base) != int:
+            if power.value != 1 or self.value_type(base) != float:
+                return node
+        if power.value == 1:
+            return base
+        if 2 <= power.value <= MAX_EXPANDED_POWER:
+            result = base
+            for _ in range(power.value - 1):
+                result = OperationNode("*", result, base)
+            return result
+        return node
+
+    def __leaf_power(self, node):
+        """Finds multiplication chain of the same leaf, integer power of leaf is counted as several factors.
+
+        Chain is walked from the top and walk stops at the first different factor, so it does not depend on
+        length of chain of different factors.
+
+        Args:
+            node: node of expression tree
+
+        Returns:
+            tuple of leaf and count of its factors or None if node is not such chain
+        """
+        leaf, count = None, 0
+        stack = [node]
+        while len(stack) > 0:
+            node = stack.pop()
+            if isinstance(node, OperationNode) and node.operation == "*":
+                stack.extend(node.children)
+                continue
+            factor = self.__leaf_factor(node)
+            if factor is None or (leaf is not None and factor[0] != leaf):
+                return None
+            leaf, count = factor[0], count + factor[1]
+        return leaf, count
+
+    @staticmethod
+    def __leaf_factor(node):
+        """Returns tuple of leaf and its power if node is leaf or positive integer power of leaf, otherwise None."""
+        if node.is_leaf():
+            return node, 1
+        if isinstance(node, OperationNode) and node.operation == "^":
+            base, power = node.children
+            if base.is_leaf() and isinstance(power, NumberNode) and type(power.value) == int and power.value > 0:
+                return base, power.value
+        return None
+
+    def __keeps_type(self, node, identity, is_addition=False):
+        """Checks that operation of node with identity value returns value equal to node value.
+
+        Args:
+            node: node which value is kept
+            identity: number node with identity value (0 or 1)
+            is_addition: True if identity is added, -0.0 + 0 is 0.0 so float can not be kept exactly
+
+        Returns:
+            True if identity operation can be removed
+        """
+        if not self.strict:
+            return type(identity.value) != bool
+        node_type = self.value_type(node)
+        if type(identity.value) != int:
+            return False
+        return node_type == int or (node_type == float and not is_addition)
+
+    @staticmethod
+    def __is_number(node, value):
+        return isinstance(node, NumberNode) and type(node.value) != bool and node.value == value
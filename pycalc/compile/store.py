@@ -0,0 +1,105 @@
+"""Module with thread-safe store of compiled expressions."""
+import threading
+
+from pycalc.compile.expression import Environment, compile_expression
+from pycalc.compile.tiering import TieredExpression
+
+
+class ExpressionStore:
+    """Thread-safe store of compiled expressions.
+
+    Compiled expressions are kept in several shards. Reads are done without locks, every shard has its own lock
+    which is taken only to compile missing expression, so threads do not compete for one lock and one expression
+    is never compiled twice.
+
+    If tier threshold is set, expressions are stored as tiered expressions, which are compiled to python functions
+    after given count of evaluations.
+
+    If max cost is set, expressions which estimated evaluation cost exceeds it are rejected before evaluation.
+
+    If max size is set, every shard keeps its part of max size and the oldest expression of shard is removed
+    when new expression is added to full shard.
+
+    Attributes:
+        environment: environment used to compile expressions
+        tier_threshold: count of evaluations after which expression is compiled, None to disable tiered execution
+        max_cost: maximal estimated cost of expression evaluation, None to accept all expressions
+        max_size: maximal count of stored expressions, None for unbounded store
+    """
+    def __init__(self, environment=None, shards=16, tier_threshold=None, max_cost=None, function_costs=None,
+                 max_size=None):
+        if shards < 1:
+            raise ValueError("Store requires at least 1 shard")
+        if max_size is not None and max_size < shards:
+            raise ValueError("Store size has to be at least count of shards")
+        self.__environment = environment if environment is not None else Environment()
+        self.__tier_threshold = tier_threshold
+        self.__max_cost = max_cost
+        self.__function_costs = function_costs
+        self.__max_size = max_size
+        self.__shard_size = None if max_size is None else max_size // shards
+        self.__shards = tuple({} for _ in range(shards))
+        self.__locks = tuple(threading.Lock() for _ in range(shards))
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.__shards)
+
+    @property
+    def environment(self):
+        return self.__environment
+
+    @property
+    def tier_threshold(self):
+        return self.__tier_threshold
+
+    @property
+    def max_cost(self):
+        return self.__max_cost
+
+    @property
+    def max_size(self):
+        return self.__max_size
+
+    def stats(self):
+        """Returns list with tier and counters of every tiered expression in store."""
+        return [compiled.stats() for shard in self.__shards for compiled in list(shard.values())
+                if isinstance(compiled, TieredExpression)]
+
+    def get(self, expression, variables=()):
+        """Returns compiled expression, compiles it if it is not in store yet.
+
+        Args:
+            expression: expression to compile
+            variables: names of variables which values are provided on evaluation
+
+        Returns:
+            compiled expression or tiered expression if tier threshold is set
+        """
+        key = (expression, tuple(variables))
+        index = hash(key) % len(self.__shards)
+        shard = self.__shards[index]
+        compiled = shard.get(key)
+        if compiled is None:
+            with self.__locks[index]:
+                compiled = shard.get(key)
+                if compiled is None:
+                    compiled = compile_expression(expression, self.__environment, variables, self.__max_cost,
+                                                  self.__function_costs)
+                    if self.__tier_threshold is not None:
+                        compiled = TieredExpression(compiled, self.__tier_threshold)
+                    if self.__shard_size is not None and len(shard) >= self.__shard_size:
+                        del shard[next(iter(shard))]
+                    shard[key] = compiled
+        return compiled
+
+    def evaluate(self, expression, **values):
+        """Evaluates expression using compiled version from store.
+
+        Args:
+            expression: expression to evaluate
+            values: values of expression variables
+
+        Returns:
+            result of expression evaluation
+        """
+        return self.get(expression, sorted(values)).evaluate(**values)
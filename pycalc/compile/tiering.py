@@ -0,0 +1,180 @@
+"""Module with tiered execution: hot expressions are promoted from interpreter to generated python functions."""
+import itertools
+import math
+import threading
+
+from pycalc.compile.tree import NumberNode, VariableNode, OperationNode, CallNode, build_tree
+
+# Count of evaluations after which expression is compiled to python function.
+DEFAULT_THRESHOLD = 100
+# Python operators for operations from SUPPORTED_OPERATIONS.
+PYTHON_OPERATORS = {"^": "**"}
+# Names of execution tiers.
+INTERPRETER_TIER = "interpreter"
+COMPILING_TIER = "compiling"
+COMPILED_TIER = "compiled"
+FAILED_TIER = "failed"
+# Longer integers are passed to generated function as constants instead of literals in its source
+MAX_LITERAL_BITS = 64
+
+
+def generate_function(expression):
+    """Generates python function that calculates compiled expression.
+
+    Args:
+        expression: compiled expression
+
+    Returns:
+        function that accepts values of expression variables as positional arguments in expression.variables order
+    """
+    namespace = {}
+    names = {name: "v" + str(index) for index, name in enumerate(expression.variables)}
+    body = __generate(build_tree(expression.program), names, namespace)
+    source = "def compiled(" + ", ".join(names.values()) + "):\n    return " + body + "\n"
+    exec(compile(source, "<pycalc " + expression.source + ">", "exec"), namespace)
+    return namespace["compiled"]
+
+
+def __generate(node, names, namespace):
+    """Generates python source of node.
+
+    Args:
+        node: node of expression tree
+        names: dictionary with python names of variables
+        namespace: dictionary with functions and constants used by generated source
+
+    Returns:
+        python expression
+    """
+    if isinstance(node, NumberNode):
+        if (type(node.value) == bool or (type(node.value) == int and node.value.bit_length() <= MAX_LITERAL_BITS) or
+                (type(node.value) == float and math.isfinite(node.value))):
+            return "(" + repr(node.value) + ")"
+        name = "c" + str(len(namespace))
+        namespace[name] = node.value
+        return name
+    if isinstance(node, VariableNode):
+        return names[node.name]
+    children = [__generate(child, names, namespace) for child in node.children]
+    if isinstance(node, OperationNode):
+        return "(" + children[0] + " " + PYTHON_OPERATORS.get(node.operation, node.operation) + " " + \
+            children[1] + ")"
+    if isinstance(node, CallNode):
+        name = "f" + str(len(namespace))
+        namespace[name] = node.function
+        return name + "(" + ", ".join(children) + ")"
+    if node.function == "if":
+        return "(" + children[1] + " if " + children[0] + " else " + children[2] + ")"
+    return "(" + (" " + node.function + " ").join(children) + ")"
+
+
+class TieredExpression:
+    """Compiled expression that changes the way it is calculated when it is evaluated often.
+
+    Expression is calculated by interpreter of reverse polish notation first. When count of evaluations reaches
+    threshold, python function is generated for expression in background thread and used for all next
+    evaluations. If function can not be generated, expression stays in interpreter.
+
+    Attributes:
+        expression: compiled expression
+        threshold: count of evaluations after which expression is compiled, None to never compile
+        calls: count of evaluations
+        tier: current tier: "interpreter", "compiling", "compiled" or "failed"
+        error: error of function generation if it failed
+    """
+    def __init__(self, expression, threshold=DEFAULT_THRESHOLD):
+        self.__expression = expression
+        self.__threshold = threshold
+        self.__counter = itertools.count(1)
+        self.__calls = 0
+        self.__function = None
+        self.__tier = INTERPRETER_TIER
+        self.__error = None
+        self.__promoted = threading.Event()
+        self.__lock = threading.Lock()
+
+    def __repr__(self):
+        return "TieredExpression(" + repr(self.__expression.source) + ", " + self.__tier + ")"
+
+    @property
+    def expression(self):
+        return self.__expression
+
+    @property
+    def threshold(self):
+        return self.__threshold
+
+    @property
+    def calls(self):
+        return self.__calls
+
+    @property
+    def tier(self):
+        return self.__tier
+
+    @property
+    def error(self):
+        return self.__error
+
+    def stats(self):
+        """Returns dictionary with source, tier and counters of expression."""
+        return {"source": self.__expression.source, "tier": self.__tier, "calls": self.__calls,
+                "threshold": self.__threshold}
+
+    def evaluate(self, **values):
+        """Evaluates expression using current tier.
+
+        Args:
+            values: values of expression variables
+
+        Returns:
+            result of expression evaluation
+        """
+        self.__calls = calls = next(self.__counter)
+        function = self.__function
+        if function is None:
+            if calls == self.__threshold:
+                self.promote(background=True)
+            return self.__expression.evaluate(**values)
+        try:
+            args = [values[name] for name in self.__expression.variables]
+        except KeyError as e:
+            raise ValueError("Missing value for variable: " + e.args[0])
+        return function(*args)
+
+    def promote(self, background=False):
+        """Compiles expression to python function.
+
+        Args:
+            background: compile in background thread, function is used as soon as it is ready
+        """
+        with self.__lock:
+            if self.__tier != INTERPRETER_TIER:
+                return
+            self.__tier = COMPILING_TIER
+        if background:
+            threading.Thread(target=self.__compile, daemon=True).start()
+        else:
+            self.__compile()
+
+    def wait_promoted(self, timeout=None):
+        """Waits until compilation started by promote is finished.
+
+        Args:
+            timeout: maximal waiting time in seconds
+
+        Returns:
+            True if compilation is finished
+        """
+        return self.__promoted.wait(timeout)
+
+    def __compile(self):
+        """Generates python function and replaces interpreter with it."""
+        try:
+            self.__function = generate_function(self.__expression)
+            self.__tier = COMPILED_TIER
+        except Exception as e:
+            self.__error = e
+            self.__tier = FAILED_TIER
+        finally:
+            self.__promoted.set()
@@ -0,0 +1,267 @@
+"""Module with expression tree that is rebuilt from reverse polish notation and compiled back to it."""
+import math
+
+from pycalc.data.tokens import TokenType, NumberToken, VariableToken, FunctionToken, OperationToken, JumpToken
+from pycalc.parse import parser_utils
+
+
+class Node:
+    """Base node of expression tree.
+
+    Nodes are never changed after creation. Two nodes are equal if they represent the same expression.
+    Key contains child nodes themselves and hash is calculated once, so hashing takes constant time. Nodes are
+    compared without recursion and the same child nodes are compared by identity.
+
+    Attributes:
+        children: child nodes
+        key: hashable representation of node: node kind, its own data and child nodes
+    """
+    def __init__(self, children, key):
+        self.children = tuple(children)
+        self.key = key + self.children
+        self.__data = key
+        self.__hash = hash(self.key)
+
+    def __eq__(self, other):
+        pairs = [(self, other)]
+        while len(pairs) > 0:
+            node, other_node = pairs.pop()
+            if node is other_node:
+                continue
+            if (not isinstance(other_node, Node) or node.__hash != other_node.__hash or
+                    node.__data != other_node.__data or len(node.children) != len(other_node.children)):
+                return False
+            pairs.extend(zip(node.children, other_node.children))
+        return True
+
+    def __hash__(self):
+        return self.__hash
+
+    def is_leaf(self):
+        """Returns True if node has no children."""
+        return len(self.children) == 0
+
+
+class NumberNode(Node):
+    """Node to represent number or boolean.
+
+    Numbers of different types are not equal. Floats also keep their sign, so 0.0 and -0.0 are not equal,
+    and all NaNs are equal.
+
+    Attributes:
+        value: number/boolean value
+    """
+    def __init__(self, value):
+        if isinstance(value, float):
+            key = ("number", type(value), math.copysign(1, value), "nan" if math.isnan(value) else value)
+        else:
+            key = ("number", type(value), value)
+        super().__init__((), key)
+        self.value = value
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class VariableNode(Node):
+    """Node to represent variable.
+
+    Attributes:
+        name: variable name
+    """
+    def __init__(self, name):
+        super().__init__((), ("variable", name))
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+class OperationNode(Node):
+    """Node to represent operation from SUPPORTED_OPERATIONS.
+
+    Attributes:
+        operation: operation as string value
+    """
+    def __init__(self, operation, left, right):
+        super().__init__((left, right), ("operation", operation))
+        self.operation = operation
+
+    def __repr__(self):
+        return "(" + repr(self.children[0]) + " " + self.operation + " " + repr(self.children[1]) + ")"
+
+
+class CallNode(Node):
+    """Node to represent function call.
+
+    Attributes:
+        function: callable function
+    """
+    def __init__(self, function, args):
+        super().__init__(args, ("call", function))
+        self.function = function
+
+    def __repr__(self):
+        name = getattr(self.function, "__name__", str(self.function))
+        return name + "(" + ", ".join(repr(child) for child in self.children) + ")"
+
+
+class ConditionalNode(Node):
+    """Node to represent conditional function: if, and, or.
+
+    Only the first argument is always calculated, other ones are calculated lazily.
+
+    Attributes:
+        function: conditional function name
+    """
+    def __init__(self, function, args):
+        super().__init__(args, ("conditional", function))
+        self.function = function
+
+    def __repr__(self):
+        return self.function + "(" + ", ".join(repr(child) for child in self.children) + ")"
+
+
+def build_tree(program):
+    """Rebuilds expression tree from reverse polish notation.
+
+    Args:
+        program: tokens in reverse polish notation
+
+    Returns:
+        root node of expression tree
+    """
+    return __build_single(program, 0, len(program))
+
+
+def __build_single(program, start, end):
+    """Rebuilds tree from part of reverse polish notation which calculates exactly one value.
+
+    Args:
+        program: tokens in reverse polish notation
+        start: index of first token of part
+        end: index after last token of part
+
+    Returns:
+        root node of expression tree
+
+    Raises:
+        ValueError: if part of program does not calculate exactly one value
+    """
+    stack = []
+    index = start
+    while index < end:
+        token = program[index]
+        if token.type == TokenType.VARIABLE:
+            stack.append(VariableNode(token.name))
+        elif token.is_number():
+            stack.append(NumberNode(token.value))
+        elif token.is_jump() and token.condition is False:
+            condition = stack.pop()
+            else_start = token.target
+            end_jump = program[else_start - 1]
+            then_node = __build_single(program, index + 1, else_start - 1)
+            else_node = __build_single(program, else_start, end_jump.target)
+            stack.append(ConditionalNode("if", (condition, then_node, else_node)))
+            index = end_jump.target
+            continue
+        elif token.is_jump():
+            left = stack.pop()
+            right = __build_single(program, index + 1, token.target)
+            stack.append(ConditionalNode(token.condition, (left, right)))
+            index = token.target
+            continue
+        elif token.is_function():
+            args_start = len(stack) - token.param_count
+            args = tuple(stack[args_start:])
+            del stack[args_start:]
+            stack.append(CallNode(token.function, args))
+        else:
+            right = stack.pop()
+            left = stack.pop()
+            stack.append(OperationNode(token.operation, left, right))
+        index += 1
+    if len(stack) != 1:
+        raise ValueError("Program does not calculate exactly one value")
+    return stack[0]
+
+
+def transform(node, function):
+    """Rebuilds tree bottom-up without recursion.
+
+    Args:
+        node: root node of expression tree
+        function: function that receives node and its already transformed children and returns new node
+
+    Returns:
+        root node of transformed tree
+    """
+    results = []
+    stack = [(node, False)]
+    while len(stack) > 0:
+        current, is_visited = stack.pop()
+        if is_visited or current.is_leaf():
+            children_start = len(results) - len(current.children)
+            children = tuple(results[children_start:])
+            del results[children_start:]
+            results.append(function(current, children))
+        else:
+            stack.append((current, True))
+            stack.extend((child, False) for child in reversed(current.children))
+    return results[0]
+
+
+def build_program(node):
+    """Compiles expression tree to reverse polish notation without recursion.
+
+    Args:
+        node: root node of expression tree
+
+    Returns:
+        tokens in reverse polish notation
+    """
+    result = []
+    actions = [(__VISIT, node)]
+    while len(actions) > 0:
+        action, item = actions.pop()
+        if action == __TOKEN:
+            result.append(item)
+        elif action == __TARGET:
+            item.target = len(result)
+        else:
+            actions.extend(reversed(__node_actions(item)))
+    return result
+
+
+# Actions of program building: visit node, add token and set target of jump to the current position.
+__VISIT, __TOKEN, __TARGET = range(3)
+
+
+def __node_actions(node):
+    """Returns actions which add tokens that calculate node to the reverse polish notation.
+
+    Args:
+        node: node of expression tree
+
+    Returns:
+        list of actions in execution order
+    """
+    if isinstance(node, NumberNode):
+        return [(__TOKEN, NumberToken(node.value))]
+    if isinstance(node, VariableNode):
+        return [(__TOKEN, VariableToken(node.name))]
+    children = [(__VISIT, child) for child in node.children]
+    if isinstance(node, OperationNode):
+        operation = OperationToken(node.operation, parser_utils.SUPPORTED_OPERATIONS.get(node.operation, 0))
+        return children + [(__TOKEN, operation)]
+    if isinstance(node, CallNode):
+        return children + [(__TOKEN, FunctionToken(node.function, len(node.children)))]
+    if node.function == "if":
+        condition_jump, end_jump = JumpToken(False), JumpToken(None)
+        return [children[0], (__TOKEN, condition_jump), children[1], (__TOKEN, end_jump),
+                (__TARGET, condition_jump), children[2], (__TARGET, end_jump)]
+    jumps = [JumpToken(node.function) for _ in children[1:]]
+    actions = [children[0]]
+    for jump, child in zip(jumps, children[1:]):
+        actions += [(__TOKEN, jump), child]
+    return actions + [(__TARGET, jump) for jump in jumps]
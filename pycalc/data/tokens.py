@@ -12,6 +12,8 @@ class TokenType(Enum):
     CLOSE_BRACE = 4
     CONSTANT = 5
     DELIMITER = 6
+    VARIABLE = 7
+    JUMP = 8
 
 
 class Token:
@@ -45,6 +47,11 @@ class Token:
         """Returns True is current token represents function."""
         return False
 
+    @staticmethod
+    def is_jump():
+        """Returns True is current token represents jump in reverse polish notation."""
+        return False
+
 
 class NumberToken(Token):
     """Token to represent number or boolean.
@@ -66,6 +73,26 @@ class NumberToken(Token):
         return True
 
 
+class VariableToken(Token):
+    """Token to represent variable which value is provided on evaluation.
+
+    Attributes:
+        name: variable name
+    """
+    def __init__(self, name):
+        super().__init__(TokenType.VARIABLE)
+        self.name = name
+
+    def __repr__(self):
+        return str(self.name)
+
+    def __eq__(self, other):
+        return other.type == TokenType.VARIABLE and self.name == other.name
+
+    def is_number(self):
+        return True
+
+
 class FunctionToken(Token):
     """Token to represent function.
 
@@ -87,6 +114,10 @@ class FunctionToken(Token):
     def is_function(self):
         return True
 
+    def with_param_count(self, param_count):
+        """Returns copy of token with given arguments count."""
+        return FunctionToken(self.function, param_count)
+
     def calculate(self, args):
         """Evaluates function.
 
@@ -96,10 +127,86 @@ class FunctionToken(Token):
         Returns:
             result of function evaluation
         """
+        return NumberToken(self.apply(args))
+
+    def apply(self, args):
+        """Evaluates function without wrapping result to token.
+
+        Args:
+            args: function argument
+
+        Returns:
+            result of function evaluation as number/boolean value
+        """
         if len(args) != self.param_count:
             raise ValueError("Unexpected arguments count for function: " + str(self))
-        result = self.function(*args)
-        return NumberToken(result)
+        return self.function(*args)
+
+
+class ConditionalToken(FunctionToken):
+    """Token to represent function with lazily evaluated arguments: if, and, or.
+
+    Such token is never calculated directly, it is replaced by jumps in reverse polish notation.
+
+    Attributes:
+        function: function name
+        param_count: count of function arguments
+    """
+    def with_param_count(self, param_count):
+        if self.function == "if" and param_count != 3:
+            raise ValueError("Function if requires 3 arguments")
+        if self.function != "if" and param_count < 2:
+            raise ValueError("Function {0} requires at least 2 arguments".format(self.function))
+        return ConditionalToken(self.function, param_count)
+
+    def apply(self, args):
+        raise ValueError("Conditional function can not be calculated directly: " + str(self))
+
+
+class JumpToken(Token):
+    """Token to represent jump in reverse polish notation.
+
+    Attributes:
+        condition: when jump is done:
+            None - always;
+            False - if value on top of stack is false, value is removed from stack;
+            "and" - if value on top of stack is false, value is kept as result, otherwise it is removed;
+            "or" - if value on top of stack is true, value is kept as result, otherwise it is removed.
+        target: index of token in reverse polish notation to jump to
+    """
+    def __init__(self, condition=None, target=None):
+        super().__init__(TokenType.JUMP)
+        self.condition = condition
+        self.target = target
+
+    def __repr__(self):
+        return "jump:" + str(self.condition) + ":" + str(self.target)
+
+    def __eq__(self, other):
+        return (other.type == TokenType.JUMP and self.condition == other.condition and
+                self.target == other.target)
+
+    def is_jump(self):
+        return True
+
+    def next_index(self, index, stack):
+        """Applies jump to the stack.
+
+        Args:
+            index: index of current token
+            stack: stack of calculated number/boolean values
+
+        Returns:
+            index of next token to calculate
+        """
+        if self.condition is None:
+            return self.target
+        if self.condition is False:
+            return index + 1 if stack.pop() else self.target
+        if bool(stack[-1]) == (self.condition == "or"):
+            return self.target
+        stack.pop()
+        return index + 1
 
 
 class OperationToken(Token):
@@ -131,6 +238,17 @@ class OperationToken(Token):
 
         Returns:
              result of operation evaluation
+        """
+        return NumberToken(self.apply(args))
+
+    def apply(self, args):
+        """Evaluates operation without wrapping result to token.
+
+        Args:
+            args: arguments for operation
+
+        Returns:
+             result of operation evaluation as number/boolean value
 
         Raises:
             ValueError: for unknown operation and if arguments count is not suitable for operation
@@ -140,31 +258,31 @@ class OperationToken(Token):
         arg1 = args[0]
         arg2 = args[1]
         if self.operation == "+":
-            return NumberToken(arg1 + arg2)
+            return arg1 + arg2
         if self.operation == "-":
-            return NumberToken(arg1 - arg2)
+            return arg1 - arg2
         if self.operation == "*":
-            return NumberToken(arg1 * arg2)
+            return arg1 * arg2
         if self.operation == "/":
-            return NumberToken(arg1 / arg2)
+            return arg1 / arg2
         if self.operation == "//":
-            return NumberToken(arg1 // arg2)
+            return arg1 // arg2
         if self.operation == "%":
-            return NumberToken(arg1 % arg2)
+            return arg1 % arg2
         if self.operation == "^":
-            return NumberToken(arg1 ** arg2)
+            return arg1 ** arg2
         if self.operation == "<":
-            return NumberToken(arg1 < arg2)
+            return arg1 < arg2
         if self.operation == "<=":
-            return NumberToken(arg1 <= arg2)
+            return arg1 <= arg2
         if self.operation == "==":
-            return NumberToken(arg1 == arg2)
+            return arg1 == arg2
         if self.operation == "!=":
-            return NumberToken(arg1 != arg2)
+            return arg1 != arg2
         if self.operation == ">=":
-            return NumberToken(arg1 >= arg2)
+            return arg1 >= arg2
         if self.operation == ">":
-            return NumberToken(arg1 > arg2)
+            return arg1 > arg2
         raise ValueError("UNSUPPORTED CALCULATION FOR ", self, args)
 
 
@@ -173,13 +291,14 @@ def create_mult_token():
     return OperationToken("*", parser_utils.SUPPORTED_OPERATIONS.get("*", 0))
 
 
-def create_token(token_str, const_dict, func_dict):
+def create_token(token_str, const_dict, func_dict, variables=()):
     """Creates token from string.
 
     Args:
         token_str: string token representation
         const_dict: dictionary with all supported constants names and their values
         func_dict: dictionary with all supported function names and their values
+        variables: names of variables which values are provided on evaluation
 
     Returns:
         token
@@ -200,6 +319,10 @@ def create_token(token_str, const_dict, func_dict):
             return OperationToken(token_str, parser_utils.SUPPORTED_OPERATIONS.get(token_str, 0))
         else:
             raise ValueError("Unsupported operation: " + token_str)
+    if token_str in variables:
+        return VariableToken(token_str)
+    if token_str in parser_utils.CONDITIONAL_FUNCTIONS:
+        return ConditionalToken(token_str)
     if token_str in const_dict:
         return NumberToken(const_dict[token_str])
     if token_str in func_dict:
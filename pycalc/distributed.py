@@ -0,0 +1,255 @@
+"""Module for distributed evaluation of expression batches by coordinator and workers connected over TCP.
+
+Coordinator splits batch to shards and sends them to workers as JSON lines:
+    request: {"shard": <shard index>, "expressions": [<expression>, ...]}
+    response: {"shard": <shard index>, "results": [{"result": <value>} or {"error": <message>}, ...]}
+Complex result is sent as {"result": {"complex": [<real part>, <imaginary part>]}}.
+"""
+import json
+import queue
+import socket
+import socketserver
+import threading
+
+from pycalc.compile.cost import longest_first
+from pycalc.compile.expression import Environment
+from pycalc.compile.store import ExpressionStore
+
+# Count of expressions sent to worker at once.
+DEFAULT_SHARD_SIZE = 100
+# Maximal time in seconds to wait for worker response, shard is sent again after it.
+DEFAULT_TIMEOUT = 60
+# Count of attempts to evaluate shard and count of consecutive failures after which worker is not used anymore.
+DEFAULT_ATTEMPTS = 3
+# Time in seconds to wait before reconnection to worker after failure, so other workers take its shard first.
+RECONNECT_DELAY = 0.1
+# Maximal count of compiled expressions kept by worker.
+DEFAULT_CACHE_SIZE = 10000
+
+
+def parse_address(address):
+    """Parses "host:port" string.
+
+    Args:
+        address: address string
+
+    Returns:
+        tuple of host and port
+
+    Raises:
+        ValueError: if address has wrong format
+    """
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise ValueError("Wrong address: " + address)
+    return host or "localhost", int(port)
+
+
+def encode_result(value):
+    """Converts result of evaluation to JSON-compatible value, complex number is converted to dictionary."""
+    if isinstance(value, complex):
+        return {"complex": [value.real, value.imag]}
+    return value
+
+
+def decode_result(value):
+    """Converts JSON value received from worker back to result of evaluation."""
+    if isinstance(value, dict) and "complex" in value:
+        return complex(*value["complex"])
+    return value
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """Handles connection of coordinator: evaluates every received shard and sends results back."""
+    def handle(self):
+        for line in self.rfile:
+            request = json.loads(line)
+            response = {"shard": request["shard"], "results": self.server.evaluate_shard(request["expressions"])}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """Worker that evaluates shards of expressions.
+
+    Environment with math and additional modules is loaded once on start, compiled expressions are reused
+    between shards. Count of kept compiled expressions is limited by cache size.
+
+    Attributes:
+        store: store of compiled expressions
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, modules=(), cache_size=DEFAULT_CACHE_SIZE):
+        super().__init__(address, WorkerHandler)
+        self.store = ExpressionStore(Environment(modules), max_size=cache_size)
+
+    def evaluate_shard(self, expressions):
+        """Evaluates expressions of shard.
+
+        Args:
+            expressions: list of expressions
+
+        Returns:
+            list of results, every result is dictionary with "result" or "error" key
+        """
+        results = []
+        for expression in expressions:
+            try:
+                result = encode_result(self.store.evaluate(expression))
+                json.dumps(result)
+                results.append({"result": result})
+            except Exception as e:
+                results.append({"error": str(e)})
+        return results
+
+
+class Coordinator:
+    """Splits batch of expressions to shards and evaluates them on workers.
+
+    Every worker takes next shard as soon as it finished previous one, so slow workers get less work. Shard of
+    worker that failed or did not respond in time is returned to the queue and evaluated by other workers, and
+    coordinator reconnects to this worker. Shard that failed given count of attempts gets error result for every
+    its expression. Worker that failed given count of times in a row is not used anymore, if all workers are not
+    used, remaining shards get error results.
+    If environment is given, expressions are sent longest-first by their estimated cost, so the most expensive
+    ones do not delay the end of the batch.
+
+    Attributes:
+        workers: list of workers addresses as (host, port) tuples
+        shard_size: count of expressions sent to worker at once
+        timeout: maximal time in seconds to wait for worker response
+        environment: environment of workers used to estimate cost of expressions, None to keep batch order
+        attempts: count of attempts to evaluate shard and count of consecutive failures of worker
+        completed_shards: dictionary with count of shards evaluated by every worker after last run
+    """
+    def __init__(self, workers, shard_size=DEFAULT_SHARD_SIZE, timeout=DEFAULT_TIMEOUT, environment=None,
+                 attempts=DEFAULT_ATTEMPTS):
+        if len(workers) == 0:
+            raise ValueError("Coordinator requires at least 1 worker")
+        if shard_size < 1:
+            raise ValueError("Shard size has to be positive")
+        if attempts < 1:
+            raise ValueError("Count of attempts has to be positive")
+        self.workers = list(workers)
+        self.shard_size = shard_size
+        self.timeout = timeout
+        self.environment = environment
+        self.attempts = attempts
+        self.completed_shards = {}
+
+    def evaluate(self, expressions):
+        """Evaluates expressions on workers.
+
+        Args:
+            expressions: list of expressions
+
+        Returns:
+            list of results in the same order as expressions, every result is dictionary with "result" or "error"
+        """
+        order = list(range(len(expressions)))
+        if self.environment is not None:
+            order = longest_first(expressions, self.environment)
+        shards = [[expressions[index] for index in order[start:start + self.shard_size]]
+                  for start in range(0, len(expressions), self.shard_size)]
+        pending = queue.Queue()
+        for index, shard in enumerate(shards):
+            pending.put((index, shard))
+        results = [None] * len(shards)
+        failures = [0] * len(shards)
+        finished = threading.Event()
+        lock = threading.Lock()
+        self.completed_shards = {worker: 0 for worker in self.workers}
+        if len(shards) == 0:
+            finished.set()
+        threads = [threading.Thread(target=self.__run_worker,
+                                    args=(worker, pending, results, failures, finished, lock), daemon=True)
+                   for worker in self.workers]
+        for thread in threads:
+            thread.start()
+        while not finished.wait(0.05):
+            if not any(thread.is_alive() for thread in threads):
+                with lock:
+                    for index, shard in enumerate(shards):
+                        if results[index] is None:
+                            results[index] = [{"error": "All workers failed"} for _ in shard]
+                break
+        ordered_results = [None] * len(expressions)
+        for index, result in zip(order, (result for shard_results in results for result in shard_results)):
+            ordered_results[index] = result
+        return ordered_results
+
+    def __run_worker(self, worker, pending, results, failures, finished, lock):
+        """Sends shards to one worker until all shards are evaluated or worker fails too many times in a row.
+
+        Args:
+            worker: worker address
+            pending: queue of not evaluated shards
+            results: list of results of every shard
+            failures: list of count of failed attempts of every shard
+            finished: event that is set when all shards are evaluated
+            lock: lock to update results
+        """
+        worker_failures = 0
+        while not finished.is_set() and worker_failures < self.attempts:
+            if worker_failures > 0 and finished.wait(RECONNECT_DELAY):
+                break
+            try:
+                connection = socket.create_connection(worker, self.timeout)
+            except OSError:
+                worker_failures += 1
+                continue
+            with connection, connection.makefile("rwb") as stream:
+                while not finished.is_set():
+                    try:
+                        index, shard = pending.get(timeout=0.05)
+                    except queue.Empty:
+                        continue
+                    try:
+                        stream.write(json.dumps({"shard": index, "expressions": shard}).encode() + b"\n")
+                        stream.flush()
+                        response = json.loads(stream.readline())
+                        if (not isinstance(response, dict) or response.get("shard") != index or
+                                not isinstance(response.get("results"), list) or
+                                len(response["results"]) != len(shard) or
+                                not all(isinstance(result, dict) and ("result" in result or "error" in result)
+                                        for result in response["results"])):
+                            raise ValueError("Wrong response for shard " + str(index))
+                        decoded = [{"result": decode_result(result["result"])} if "result" in result else result
+                                   for result in response["results"]]
+                    except (OSError, ValueError, TypeError) as e:
+                        worker_failures += 1
+                        self.__fail_shard(index, shard, str(e) or type(e).__name__, pending, results, failures,
+                                          finished, lock)
+                        break
+                    worker_failures = 0
+                    with lock:
+                        if results[index] is None:
+                            results[index] = decoded
+                            self.completed_shards[worker] += 1
+                        if all(shard_results is not None for shard_results in results):
+                            finished.set()
+
+    def __fail_shard(self, index, shard, error, pending, results, failures, finished, lock):
+        """Returns failed shard to the queue or sets error results if it failed all attempts.
+
+        Args:
+            index: shard index
+            shard: list of shard expressions
+            error: message of error
+            pending: queue of not evaluated shards
+            results: list of results of every shard
+            failures: list of count of failed attempts of every shard
+            finished: event that is set when all shards are evaluated
+            lock: lock to update results
+        """
+        with lock:
+            failures[index] += 1
+            if failures[index] < self.attempts:
+                pending.put((index, shard))
+            elif results[index] is None:
+                message = "Shard failed after " + str(failures[index]) + " attempts: " + error
+                results[index] = [{"error": message} for _ in shard]
+                if all(shard_results is not None for shard_results in results):
+                    finished.set()
@@ -1,5 +1,5 @@
 """Module with operations for expression parsing."""
-from pycalc.data.tokens import TokenType, create_token, create_mult_token, FunctionToken
+from pycalc.data.tokens import TokenType, create_token, create_mult_token
 from pycalc.parse import parser_utils as parser_utils
 
 
@@ -10,11 +10,13 @@ class Parser:
         expression: string expression that should be divided by tokens.
         const_dict: dictionary with all supported constants
         func_dict: dictionary with all supported functions
+        variables: names of variables which values are provided on evaluation
     """
-    def __init__(self, expression, const_dict, func_dict):
+    def __init__(self, expression, const_dict, func_dict, variables=()):
         self.__expression = expression
         self.__const_dict = const_dict
         self.__func_dict = func_dict
+        self.__variables = variables
 
     def parse_tokens(self):
         """Parse expression to tokens and validate them.
@@ -85,7 +87,8 @@ class Parser:
             tokens: list of all tokens
         """
         if len(current_token) > 0:
-            tokens.append(create_token(current_token, self.__const_dict, self.__func_dict))
+            tokens.append(create_token(current_token, self.__const_dict, self.__func_dict,
+                                       self.__variables))
 
     @staticmethod
     def __validate_and_add_explicit_mult(tokens):
@@ -108,7 +111,8 @@ class Parser:
             is_last_token = index == len(tokens) - 1
             prev_token = None if is_first_token else tokens[index - 1]
             if token.is_number() or token.is_function():
-                if prev_token and prev_token.type in [TokenType.CONSTANT, TokenType.DIGIT, TokenType.CLOSE_BRACE]:
+                if prev_token and prev_token.type in [TokenType.CONSTANT, TokenType.DIGIT, TokenType.VARIABLE,
+                                                      TokenType.CLOSE_BRACE]:
                     result_tokens.append(create_mult_token())
                 elif prev_token and prev_token.type in [TokenType.FUNCTION]:
                     raise ValueError("Wrong tokens order")
@@ -119,7 +123,8 @@ class Parser:
                     raise ValueError("Wrong tokens order")
             elif token.type == TokenType.OPEN_BRACE:
                 bracers += 1
-                if prev_token and prev_token.type in [TokenType.CONSTANT, TokenType.DIGIT, TokenType.CLOSE_BRACE]:
+                if prev_token and prev_token.type in [TokenType.CONSTANT, TokenType.DIGIT, TokenType.VARIABLE,
+                                                      TokenType.CLOSE_BRACE]:
                     result_tokens.append(create_mult_token())
                 if prev_token and prev_token.is_function():
                     function_stack.append((bracers, len(result_tokens) - 1, 0))
@@ -133,7 +138,7 @@ class Parser:
                     _, f_index, f_delimiters = function_stack.pop()
                     function = result_tokens[f_index]
                     param_count = 0 if prev_token.type == TokenType.OPEN_BRACE else f_delimiters + 1
-                    result_tokens[f_index] = FunctionToken(function.function, param_count)
+                    result_tokens[f_index] = function.with_param_count(param_count)
                 elif prev_token and prev_token.type in [TokenType.OPEN_BRACE]:
                     raise ValueError("Wrong tokens order")
             elif token.type == TokenType.DELIMITER:
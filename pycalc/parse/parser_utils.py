@@ -6,8 +6,12 @@ SUPPORTED_OPERATIONS = {
     "+": 1, "-": 1,
     "*": 2, "/": 2, "//": 2, "%": 2,
     "^": 3,
-    "<": 4, "<=": 4, "==": 4, "!=": 4, ">=": 4, ">": 4
+    "<": 0, "<=": 0, "==": 0, "!=": 0, ">=": 0, ">": 0
 }
+# Operations which result is always boolean.
+COMPARISON_OPERATIONS = ("<", "<=", "==", "!=", ">=", ">")
+# Functions which arguments are evaluated lazily, they are compiled to conditional jumps.
+CONDITIONAL_FUNCTIONS = ("if", "and", "or")
 # Regular expression to match operations.
 __OPERATION_REGEXP = r'^[\\+-/%^*<>=!]+$'
 # Regular expression to match constants and functions names.
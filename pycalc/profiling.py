@@ -0,0 +1,56 @@
+"""Module for measuring memory allocations of expression parsing and evaluation."""
+import tracemalloc
+from collections import namedtuple
+
+# Memory allocated by one call:
+#   blocks - count of memory blocks that are still allocated after call;
+#   size - size in bytes of memory that is still allocated after call;
+#   peak - maximum size in bytes of memory allocated during call.
+MemoryProfile = namedtuple("MemoryProfile", ["blocks", "size", "peak"])
+
+
+def profile_memory(function, *args, **kwargs):
+    """Calls function and measures memory it allocates.
+
+    Memory is traced with tracemalloc. If tracing was not started before, it is started only for this call.
+
+    Args:
+        function: function to call
+        args: positional arguments for function
+        kwargs: keyword arguments for function
+
+    Returns:
+        tuple of function result and MemoryProfile
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start_size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = function(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    traces_filter = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    statistics = after.filter_traces(traces_filter).compare_to(before.filter_traces(traces_filter), "lineno")
+    blocks = sum(stat.count_diff for stat in statistics)
+    size = sum(stat.size_diff for stat in statistics)
+    return result, MemoryProfile(blocks, size, max(peak - start_size, 0))
+
+
+def format_profile(name, profile):
+    """Creates human-readable description of memory profile.
+
+    Args:
+        name: name of measured step
+        profile: MemoryProfile of step
+
+    Returns:
+        profile description
+    """
+    return "{0}: {1} blocks, {2} bytes retained, {3} bytes peak".format(name, profile.blocks, profile.size,
+                                                                         profile.peak)
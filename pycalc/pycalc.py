@@ -1,9 +1,13 @@
 """Module for expression evaluation."""
 import numbers
+import operator
 
-from .data.tokens import TokenType
+from .data.tokens import TokenType, ConditionalToken, JumpToken
 from .parse.parser import Parser
 
+# Functions that are available without loading modules.
+BUILTIN_FUNCTIONS = {"abs": abs, "round": round, "not": operator.not_}
+
 
 def load(module_name, constants_dict, functions_dict):
     """Loads module and aggregate all public constants and functions.
@@ -25,21 +29,28 @@ def load(module_name, constants_dict, functions_dict):
 def reverse_polish_notation(tokens):
     """Converts tokens list to reverse polish notation.
 
+    Conditional functions (if, and, or) are not added to the result, their arguments are divided by jumps instead,
+    so arguments that do not affect result are never calculated.
+
     Args:
         tokens: tokens list in direct order
 
     Returns:
         tokens in reverse polish notation
     """
-    result, stack = [], []
+    result, stack, jumps = [], [], []
     for token in tokens:
         if token.is_number():
             result.append(token)
         if token.is_function():
             stack.append(token)
+            if isinstance(token, ConditionalToken):
+                jumps.append([])
         if token.type == TokenType.DELIMITER:
             while len(stack) > 0 and stack[-1].type != TokenType.OPEN_BRACE:
                 result.append(stack.pop())
+            if len(stack) > 1 and isinstance(stack[-2], ConditionalToken):
+                __add_conditional_jump(stack[-2], jumps[-1], result)
         if token.type == TokenType.OPEN_BRACE:
             stack.append(token)
         if token.type == TokenType.CLOSE_BRACE:
@@ -47,7 +58,11 @@ def reverse_polish_notation(tokens):
                 result.append(stack.pop())
             if len(stack) > 0 and stack[-1].type == TokenType.OPEN_BRACE:
                 stack.pop()
-            if len(stack) > 0 and stack[-1].type == TokenType.FUNCTION:
+            if len(stack) > 0 and isinstance(stack[-1], ConditionalToken):
+                function = stack.pop()
+                for jump in jumps.pop()[-1 if function.function == "if" else 0:]:
+                    jump.target = len(result)
+            elif len(stack) > 0 and stack[-1].type == TokenType.FUNCTION:
                 result.append(stack.pop())
         if token.type == TokenType.OPERATION:
             while (len(stack) > 0 and stack[-1].type == TokenType.OPERATION and
@@ -59,26 +74,58 @@ def reverse_polish_notation(tokens):
     return result
 
 
-def calculate(tokens):
+def __add_conditional_jump(function, jumps, result):
+    """Adds jump after argument of conditional function.
+
+    Args:
+        function: conditional function token
+        jumps: jumps already added for this function
+        result: tokens in reverse polish notation
+    """
+    if function.function == "if":
+        jump = JumpToken(False if len(jumps) == 0 else None)
+        result.append(jump)
+        if len(jumps) > 0:
+            jumps[0].target = len(result)
+    else:
+        jump = JumpToken(function.function)
+        result.append(jump)
+    jumps.append(jump)
+
+
+def calculate(tokens, variables=None):
     """Calculates result.
 
     Args:
         tokens: tokens in reverse polish notation.
+        variables: dictionary with values of variables used in expression
 
     Returns:
          result of expression
+
+    Raises:
+        ValueError: if value of some variable is not provided
     """
     stack = []
-    for token in tokens:
-        if token.is_number():
-            stack.append(token)
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        index += 1
+        if token.type == TokenType.VARIABLE:
+            if variables is None or token.name not in variables:
+                raise ValueError("Missing value for variable: " + token.name)
+            stack.append(variables[token.name])
+        elif token.is_number():
+            stack.append(token.value)
+        elif token.is_jump():
+            index = token.next_index(index - 1, stack)
         else:
-            args = []
             args_count = token.param_count if token.is_function() else 2
-            for i in range(args_count):
-                args.insert(0, stack.pop().value)
-            stack.append(token.calculate(tuple(args)))
-    return stack[0].value
+            args_start = len(stack) - args_count
+            args = tuple(stack[args_start:])
+            del stack[args_start:]
+            stack.append(token.apply(args))
+    return stack[0]
 
 
 def evaluate(modules, expression):
@@ -91,10 +138,9 @@ def evaluate(modules, expression):
     Returns:
         result of expression evaluation
     """
-    modules.insert(0, "math")
     constants_dict = {}
-    functions_dict = {"abs": abs, "round": round}
-    for module in modules:
+    functions_dict = dict(BUILTIN_FUNCTIONS)
+    for module in ["math"] + list(modules):
         load(module, constants_dict, functions_dict)
     tokens = Parser(expression, constants_dict, functions_dict).parse_tokens()
     result = calculate(reverse_polish_notation(tokens))
@@ -0,0 +1,101 @@
+import math
+import tracemalloc
+import unittest
+
+from pycalc.compile.expression import Environment, compile_expression
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from pycalc.compile.arrays import *
+
+
+def twice(number):
+    return 2 * number
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class ArraysTest(unittest.TestCase):
+    def compile(self, source, variables=("x", "y")):
+        environment = Environment()
+        return compile_expression(source, environment, variables)
+
+    def assert_same_as_calculate(self, source, x, y, block_size):
+        expression = self.compile(source)
+        result = evaluate_blocked(expression, {"x": x, "y": y}, block_size)
+        expected = [expression.evaluate(x=float(a), y=float(b)) for a, b in zip(x, y)]
+        numpy.testing.assert_allclose(result, numpy.array(expected, dtype=float), rtol=1e-12)
+
+    def test_operations(self):
+        x = numpy.linspace(1, 10, 1000)
+        y = numpy.linspace(-3, 7, 1000) + 0.5
+        for source in ["x + y*2 - x/y", "x // y + x % 3", "x^2 + (x > y) + (x <= 5)", "2*3 + x"]:
+            self.assert_same_as_calculate(source, x, y, 64)
+
+    def test_functions(self):
+        x = numpy.linspace(0.1, 0.9, 777)
+        y = numpy.linspace(1, 2, 777)
+        for source in ["sin(x)^2 + cos(x)^2", "asin(x) + atan2(x, y) + abs(x - y)", "log(y, 2) + round(y*x)",
+                       "sqrt(x^2 + y^2) + not(x > 0.5)"]:
+            self.assert_same_as_calculate(source, x, y, 100)
+
+    def test_functions_without_ufunc(self):
+        x = numpy.linspace(-7, 7, 301)
+        y = numpy.linspace(1, 3, 301)
+        for source in ["remainder(x, 3)", "log(y, 3) + gcd(2, 4)", "copysign(x, 0 - 1) + isclose(x, y)"]:
+            self.assert_same_as_calculate(source, x, y, 50)
+
+    def test_custom_function(self):
+        expression = compile_expression("twice(x) + 1", Environment(["arrays_test"]), ["x"])
+        numpy.testing.assert_array_equal(evaluate_blocked(expression, {"x": numpy.arange(5)}, 2),
+                                         [1, 3, 5, 7, 9])
+
+    def test_scalar_variable(self):
+        expression = self.compile("x * y")
+        numpy.testing.assert_array_equal(evaluate_blocked(expression, {"x": numpy.arange(3), "y": 2}), [0, 2, 4])
+
+    def test_integer_inputs_are_converted_by_blocks(self):
+        expression = self.compile("x / y")
+        x = numpy.arange(1, 200001, dtype=numpy.int64)
+        y = numpy.full(len(x), 2, dtype=numpy.int32)
+        out = numpy.empty(len(x))
+        tracemalloc.start()
+        evaluate_blocked(expression, {"x": x, "y": y}, 1024, out)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(peak, 10 * 1024 * 8)
+        numpy.testing.assert_array_equal(out, x / 2)
+
+    def test_output_array(self):
+        expression = self.compile("x + y")
+        out = numpy.zeros(10)
+        result = evaluate_blocked(expression, {"x": numpy.arange(10), "y": numpy.ones(10)}, 3, out)
+        self.assertIs(result, out)
+        numpy.testing.assert_array_equal(out, numpy.arange(1, 11))
+
+    def test_different_length(self):
+        with self.assertRaisesRegex(ValueError, "Arrays have to be one-dimensional and have the same length"):
+            evaluate_blocked(self.compile("x + y"), {"x": numpy.arange(3), "y": numpy.arange(4)})
+
+    def test_conditional_functions(self):
+        with self.assertRaisesRegex(ValueError, "Conditional functions are not supported in array evaluation"):
+            evaluate_blocked(self.compile("if(x, y, 1)"), {"x": numpy.arange(3), "y": numpy.arange(3)})
+
+    def test_block_memory(self):
+        expression = self.compile("sin(x)*cos(y) + (x*y - x/y)^2 + exp(0 - x)")
+        x = numpy.linspace(1, 2, 200000)
+        y = numpy.linspace(2, 3, 200000)
+        out = numpy.empty(len(x))
+        tracemalloc.start()
+        evaluate_blocked(expression, {"x": x, "y": y}, 1024, out)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(peak, 10 * 1024 * 8)
+        self.assertAlmostEqual(out[0], math.sin(1) * math.cos(2) + (2 - 0.5) ** 2 + math.exp(-1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import math
+import unittest
+
+from pycalc.compile.cost import *
+from pycalc.compile.expression import Environment, compile_expression
+
+
+def heavy(number):
+    return number
+
+
+class CostTest(unittest.TestCase):
+    def setUp(self):
+        self.environment = Environment(["cost_test"])
+
+    def cost(self, source, function_costs=None):
+        return expression_cost(source, self.environment, ["x"], function_costs)
+
+    def test_operations(self):
+        self.assertEqual(self.cost("1 + 2"), 3)
+        self.assertEqual(self.cost("x/2 - 3*x"), 8)
+
+    def test_functions(self):
+        self.assertEqual(self.cost("heavy(x)"), DEFAULT_FUNCTION_COST + 1 + 1)
+        self.assertEqual(self.cost("sqrt(x)"), 3 + 1 + 1)
+        self.assertEqual(self.cost("heavy(x)", {heavy: 1000}), 1000 + 1 + 1)
+
+    def test_nesting(self):
+        self.assertLess(self.cost("(1)"), self.cost("((1))"))
+        self.assertLess(self.cost("((1))"), self.cost("(((1)))"))
+
+    def test_power_literals(self):
+        self.assertLess(self.cost("x^2"), self.cost("x^1000"))
+        self.assertLess(self.cost("x^1000"), self.cost("10^100000"))
+        self.assertGreater(self.cost("10^100000"), 1000)
+
+    def test_power_inside_braces(self):
+        for source in ["(10)^1000000", "10^(1000000)", "(10^(1000000))", "10^(10^6)", "(2*5)^(999999 + 1)"]:
+            self.assertGreater(self.cost(source), 50000, source)
+        self.assertLess(self.cost("2^(2^(2^(2^2)))"), 2000)
+        self.assertGreater(self.cost("2^(2^(2^(2^2 + 1)))"), 10 ** 70)
+
+    def test_power_of_unknown_size(self):
+        self.assertGreaterEqual(self.cost("2^x"), UNKNOWN_POWER_COST)
+        self.assertGreaterEqual(self.cost("10^heavy(1000)"), UNKNOWN_POWER_COST)
+        self.assertGreaterEqual(self.cost("10^if(x, 2, x)"), UNKNOWN_POWER_COST)
+        self.assertLess(self.cost("2^1.5 + x^2.5 + 2^(x/2)"), UNKNOWN_POWER_COST)
+        self.assertLess(self.cost("2^if(x, 2, 3) + 2^(x > 1)"), UNKNOWN_POWER_COST)
+
+    def test_big_integer_functions(self):
+        self.assertLess(self.cost("factorial(20)"), 200)
+        self.assertGreater(self.cost("factorial(300000)"), 50000)
+        self.assertGreater(self.cost("factorial(10^7)"), self.cost("factorial(300000)"))
+        self.assertGreater(self.cost("comb(1000000, 500000)"), 50000)
+        self.assertLess(self.cost("comb(1000000, 10) + perm(30)"), 300)
+        self.assertGreaterEqual(self.cost("factorial(x)"), FUNCTION_COSTS[math.factorial] + UNKNOWN_POWER_COST)
+        with self.assertRaisesRegex(ValueError, "exceeds budget 1000"):
+            compile_expression("factorial(300000)", self.environment, max_cost=1000)
+
+    def test_big_integer_multiplication(self):
+        self.assertEqual(self.cost("2*3"), 3)
+        self.assertGreater(self.cost("(10^100000)*(10^100000)"), 2 * self.cost("10^100000"))
+
+    def test_conditional_functions(self):
+        self.assertEqual(self.cost("if(x, 1, 2)"), 3 + 1 + 3)
+
+    def test_check_cost(self):
+        check_cost([], 0)
+        with self.assertRaisesRegex(ValueError, "Expression cost 5196.51 exceeds budget 1000"):
+            compile_expression("10^100000", self.environment, max_cost=1000)
+        with self.assertRaisesRegex(ValueError, "exceeds budget 1000"):
+            compile_expression("(10)^3000000", self.environment, max_cost=1000)
+        self.assertEqual(compile_expression("2^10", self.environment, max_cost=1000).evaluate(), 1024)
+
+    def test_longest_first(self):
+        expressions = ["1", "9^99999", "sin(2)", "unknown", "heavy(heavy(1))"]
+        self.assertEqual(longest_first(expressions, self.environment), [1, 4, 2, 0, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import math
+import unittest
+
+from pycalc.compile.cse import *
+from pycalc.compile.expression import Environment, compile_expression
+
+calls = []
+
+
+def counted(number):
+    calls.append(number)
+    return number
+
+
+class CseTest(unittest.TestCase):
+    def setUp(self):
+        del calls[:]
+        self.environment = Environment(["cse_test"])
+
+    def compile(self, *sources, pure_functions=()):
+        return compile_batch([compile_expression(source, self.environment, ["x", "y"]) for source in sources],
+                             pure_functions)
+
+    def test_is_pure_function(self):
+        self.assertTrue(is_pure_function(math.sin))
+        self.assertTrue(is_pure_function(abs))
+        self.assertFalse(is_pure_function(counted))
+        self.assertTrue(is_pure_function(counted, [counted]))
+
+    def test_share_inside_expression(self):
+        batch = self.compile("sqrt(x^2 + y^2) + sqrt(x^2 + y^2)*2")
+        self.assertEqual(batch.node_count, 9)
+        self.assertEqual(batch.evaluate(x=3, y=4), [15.0])
+
+    def test_share_between_expressions(self):
+        sources = ["sqrt(x^2 + y^2) + 1", "sqrt(x^2 + y^2)/x", "x^2"]
+        batch = self.compile(*sources)
+        self.assertEqual(batch.node_count, 10)
+        expected = [compile_expression(source, self.environment, ["x", "y"]).evaluate(x=3, y=4)
+                    for source in sources]
+        self.assertEqual(batch.evaluate(x=3, y=4), expected)
+
+    def test_impure_function_is_not_shared(self):
+        batch = self.compile("counted(x) + counted(x)", "counted(x)")
+        self.assertEqual(batch.evaluate(x=2, y=0), [4, 2])
+        self.assertEqual(calls, [2, 2, 2])
+
+    def test_pure_function_is_shared(self):
+        batch = self.compile("counted(x) + counted(x)", "counted(x)", pure_functions=[counted])
+        self.assertEqual(batch.evaluate(x=2, y=0), [4, 2])
+        self.assertEqual(calls, [2])
+
+    def test_lazy_branches(self):
+        batch = self.compile("if(x > 0, counted(x), counted(y)) + and(x, counted(y + 1))", "or(x, 1/0)")
+        self.assertEqual(batch.evaluate(x=1, y=5), [7, 1])
+        self.assertEqual(calls, [1, 6])
+
+    def test_lazy_branch_shared_with_eager_node(self):
+        batch = self.compile("if(x > 0, sqrt(y) + 1, 0)", "sqrt(y)", pure_functions=[counted])
+        self.assertEqual(batch.evaluate(x=1, y=4), [3.0, 2.0])
+        self.assertEqual(batch.evaluate(x=0, y=4), [0, 2.0])
+
+    def test_long_constant(self):
+        batch = self.compile("x + 10^5000", "10^5000 - y")
+        self.assertEqual(batch.evaluate(x=1, y=2), [10 ** 5000 + 1, 10 ** 5000 - 2])
+
+    def test_long_expression(self):
+        source = "+".join(["x"] * 600)
+        batch = self.compile(source, "if(y, " + source + ", 0)")
+        self.assertEqual(batch.node_count, 603)
+        self.assertEqual(batch.evaluate(x=2, y=1), [1200, 1200])
+        batch = self.compile("if(y, " + source + ", 0)")
+        self.assertEqual(batch.evaluate(x=2, y=1), [1200])
+        self.assertEqual(batch.evaluate(x=2, y=0), [0])
+
+    def test_missing_variable(self):
+        with self.assertRaisesRegex(ValueError, "Missing value for variable: y"):
+            self.compile("x + y").evaluate(x=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+from pycalc.compile.expression import Environment
+from pycalc.distributed import *
+
+PACKAGE_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SlowWorkerServer(WorkerServer):
+    def evaluate_shard(self, expressions):
+        time.sleep(0.2)
+        return super().evaluate_shard(expressions)
+
+
+class SlowFormulaWorkerServer(WorkerServer):
+    def evaluate_shard(self, expressions):
+        if "slow" in expressions:
+            time.sleep(0.2)
+        return super().evaluate_shard(expressions)
+
+
+class RecordingWorkerServer(WorkerServer):
+    def evaluate_shard(self, expressions):
+        self.shards = getattr(self, "shards", []) + [expressions]
+        return super().evaluate_shard(expressions)
+
+
+class FailingWorkerServer(WorkerServer):
+    def evaluate_shard(self, expressions):
+        raise RuntimeError("Worker failed")
+
+
+class MalformedWorkerHandler(WorkerHandler):
+    def handle(self):
+        for line in self.rfile:
+            self.wfile.write(json.dumps({"shard": json.loads(line)["shard"], "results": None}).encode() + b"\n")
+            self.wfile.flush()
+
+
+class MalformedWorkerServer(WorkerServer):
+    def __init__(self, address, modules=()):
+        super().__init__(address, modules)
+        self.RequestHandlerClass = MalformedWorkerHandler
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class DistributedTest(unittest.TestCase):
+    def start_workers(self, *server_classes, modules=()):
+        servers = [server_class(("localhost", 0), modules) for server_class in server_classes]
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+        return [server.server_address for server in servers]
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address("localhost:8000"), ("localhost", 8000))
+        self.assertEqual(parse_address(":8000"), ("localhost", 8000))
+        with self.assertRaisesRegex(ValueError, "Wrong address: localhost"):
+            parse_address("localhost")
+
+    def test_evaluate_in_order(self):
+        workers = self.start_workers(WorkerServer, WorkerServer, WorkerServer)
+        expressions = [str(i) + " + 1" for i in range(100)] + ["unknown", "two*3"]
+        results = Coordinator(workers, shard_size=7).evaluate(expressions)
+        expected = [{"result": i + 1} for i in range(100)] + [{"error": "Unknown token: unknown"},
+                                                              {"error": "Unknown token: two"}]
+        self.assertEqual(results, expected)
+
+    def test_longest_first(self):
+        server = RecordingWorkerServer(("localhost", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        expressions = ["1", "2^1000", "sin(1)", "x", "3"]
+        coordinator = Coordinator([server.server_address], shard_size=2, environment=Environment())
+        results = coordinator.evaluate(expressions)
+        self.assertEqual(results[0], {"result": 1})
+        self.assertEqual(results[1], {"result": 2 ** 1000})
+        self.assertEqual(results[3], {"error": "Unknown token: x"})
+        self.assertEqual(server.shards, [["2^1000", "sin(1)"], ["1", "3"], ["x"]])
+
+    def test_worker_modules(self):
+        workers = self.start_workers(WorkerServer, modules=["pycalc_test"])
+        self.assertEqual(Coordinator(workers).evaluate(["two*3", "sin(1)"]), [{"result": 6}, {"result": 2}])
+
+    def test_empty_batch(self):
+        self.assertEqual(Coordinator(self.start_workers(WorkerServer)).evaluate([]), [])
+
+    def test_skip_dead_and_failing_workers(self):
+        workers = self.start_workers(WorkerServer, FailingWorkerServer) + [("localhost", free_port())]
+        coordinator = Coordinator(workers, shard_size=3)
+        results = coordinator.evaluate([str(i) for i in range(30)])
+        self.assertEqual(results, [{"result": i} for i in range(30)])
+        self.assertEqual(coordinator.completed_shards[workers[0]], 10)
+
+    def test_malformed_response(self):
+        workers = self.start_workers(MalformedWorkerServer, WorkerServer)
+        coordinator = Coordinator(workers, shard_size=2)
+        self.assertEqual(coordinator.evaluate([str(i) for i in range(10)]), [{"result": i} for i in range(10)])
+        coordinator = Coordinator(workers[:1])
+        self.assertEqual(coordinator.evaluate(["1"]),
+                         [{"error": "Shard failed after 3 attempts: Wrong response for shard 0"}])
+
+    def test_rebalance_from_slow_worker(self):
+        workers = self.start_workers(WorkerServer, SlowWorkerServer)
+        coordinator = Coordinator(workers, shard_size=1)
+        results = coordinator.evaluate([str(i) for i in range(50)])
+        self.assertEqual(results, [{"result": i} for i in range(50)])
+        self.assertGreater(coordinator.completed_shards[workers[0]], coordinator.completed_shards[workers[1]])
+
+    def test_requeue_after_timeout(self):
+        workers = self.start_workers(SlowWorkerServer, WorkerServer)
+        coordinator = Coordinator(workers[:1], timeout=0.05)
+        self.assertEqual(coordinator.evaluate(["1", "2"]),
+                         [{"error": "Shard failed after 3 attempts: timed out"}] * 2)
+        coordinator = Coordinator(workers, shard_size=1, timeout=0.05)
+        self.assertEqual(coordinator.evaluate([str(i) for i in range(10)]), [{"result": i} for i in range(10)])
+        self.assertEqual(coordinator.completed_shards[workers[1]], 10)
+
+    def test_reconnect_after_timeout(self):
+        workers = self.start_workers(SlowFormulaWorkerServer)
+        coordinator = Coordinator(workers, shard_size=1, timeout=0.1, attempts=2)
+        results = coordinator.evaluate(["1", "slow", "2", "3"])
+        self.assertEqual(results, [{"result": 1}, {"error": "Shard failed after 2 attempts: timed out"},
+                                   {"result": 2}, {"result": 3}])
+        self.assertEqual(coordinator.completed_shards[workers[0]], 3)
+
+    def test_all_workers_failed(self):
+        workers = self.start_workers(FailingWorkerServer) + [("localhost", free_port())]
+        coordinator = Coordinator(workers, shard_size=2)
+        self.assertEqual(coordinator.evaluate(["1", "2", "3"]), [{"error": "All workers failed"}] * 3)
+
+    def test_complex_result(self):
+        workers = self.start_workers(WorkerServer)
+        results = Coordinator(workers).evaluate(["(0 - 1)^0.5", "1 + 2"])
+        self.assertEqual(results, [{"result": (0 - 1) ** 0.5}, {"result": 3}])
+
+    def test_worker_cache_size(self):
+        server = WorkerServer(("localhost", 0), cache_size=16)
+        self.addCleanup(server.server_close)
+        server.evaluate_shard([str(i) for i in range(100)])
+        self.assertLessEqual(len(server.store), 16)
+
+    def test_command_line(self):
+        ports = [free_port(), free_port()]
+        workers = [subprocess.Popen([sys.executable, "-m", "pycalc", "--worker", "localhost:" + str(port)],
+                                    cwd=PACKAGE_PATH) for port in ports]
+        for worker in workers:
+            self.addCleanup(worker.wait)
+            self.addCleanup(worker.kill)
+        for port in ports:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("localhost", port)).close()
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        output = subprocess.run([sys.executable, "-m", "pycalc", "--coordinator", "--shard-size", "2",
+                                 "--timeout", "10", "--workers"] + ["localhost:" + str(port) for port in ports],
+                                input="1+2\n2^10\n\nsqrt(16)\nx\n(0-4)^0.5\n", cwd=PACKAGE_PATH, capture_output=True,
+                                text=True, timeout=60)
+        self.assertEqual(output.stdout, "3\n1024\n4.0\nERROR: Unknown token: x\n" + str((0 - 4) ** 0.5) + "\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import math
+import unittest
+
+from pycalc.compile.expression import *
+
+
+class ExpressionTest(unittest.TestCase):
+    def test_environment_loads_math_first(self):
+        environment = Environment(["pycalc_test"])
+        self.assertEqual(environment.modules, ("math", "pycalc_test"))
+        self.assertEqual(environment.constants["pi"], math.pi)
+        self.assertEqual(environment.constants["two"], 2)
+
+    def test_environment_is_read_only(self):
+        environment = Environment()
+        with self.assertRaises(TypeError):
+            environment.constants["pi"] = 3
+
+    def test_compile_without_variables(self):
+        expression = compile_expression("2+2*2", Environment())
+        self.assertEqual(expression.evaluate(), 6)
+        self.assertIsInstance(expression.program, tuple)
+
+    def test_compile_with_variables(self):
+        expression = compile_expression("2x + sin(y)", Environment(), ["x", "y"])
+        self.assertEqual(expression.variables, ("x", "y"))
+        self.assertEqual(expression.evaluate(x=3, y=0), 6)
+        self.assertEqual(expression.evaluate(x=1, y=0), 2)
+
+    def test_variable_overwrites_constant(self):
+        expression = compile_expression("e + 1", Environment(), ["e"])
+        self.assertEqual(expression.evaluate(e=1), 2)
+
+    def test_missing_variable(self):
+        expression = compile_expression("x + 1", Environment(), ["x"])
+        with self.assertRaisesRegex(ValueError, "Missing value for variable: x"):
+            expression.evaluate()
+
+
+if __name__ == '__main__':
+    unittest.main()
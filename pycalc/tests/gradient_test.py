@@ -0,0 +1,97 @@
+import math
+import unittest
+
+from pycalc.compile.expression import Environment, compile_expression
+from pycalc.compile.gradient import *
+
+
+def twice(number):
+    return 2 * number
+
+
+def even(number):
+    return number % 2 == 0
+
+
+class GradientTest(unittest.TestCase):
+    def assert_gradient(self, source, values, environment=None):
+        expression = compile_expression(source, environment or Environment(), sorted(values))
+        value, partials = expression.gradient(**values)
+        self.assertAlmostEqual(value, expression.evaluate(**values))
+        step = 1e-6
+        for name in values:
+            upper = expression.evaluate(**dict(values, **{name: values[name] + step}))
+            lower = expression.evaluate(**dict(values, **{name: values[name] - step}))
+            self.assertAlmostEqual(partials[name], (upper - lower) / (2 * step), places=5, msg=(source, name))
+
+    def test_operations(self):
+        for source in ["x + y", "x - 2y", "x*y*3", "x/y + 1/x", "x^2*y + y^x + 2^x", "x % y + x // y"]:
+            self.assert_gradient(source, {"x": 1.5, "y": 2.5})
+
+    def test_math_functions(self):
+        for source in ["sin(x)cos(y) + tan(x)", "asin(x/3) + acos(y/3) + atan(x*y) + atan2(x, y)",
+                       "exp(x) + log(y) + log(x, 2) + log2(y) + log10(x) + log1p(y) + expm1(x)",
+                       "sqrt(x) + pow(x, y) + hypot(x, y) + fabs(0 - x) + abs(x - y)",
+                       "sinh(x) + cosh(y) + tanh(x) + asinh(y) + acosh(y) + atanh(x/2)",
+                       "erf(x) + erfc(y) + degrees(x) + radians(y) + floor(x)y + fmod(y, x)"]:
+            self.assert_gradient(source, {"x": 1.2, "y": 2.5})
+        self.assert_gradient("remainder(x, y) + ldexp(x, 3) + remainder(7, y)", {"x": 1.2, "y": 2.5})
+
+    def test_conditions(self):
+        self.assert_gradient("if(x > y, x^2, y^3) + and(x, y) + or(0, x)", {"x": 1.5, "y": 2.5})
+        self.assert_gradient("if(x > y, x^2, y^3) + and(x, y) + or(0, x)", {"x": 3.5, "y": 2.5})
+
+    def test_predicates(self):
+        self.assert_gradient("if(isnan(x), 0, x^2) + if(isinf(y), 1, y) + isfinite(x)", {"x": 1.5, "y": 2.5})
+        self.assert_gradient("if(isclose(x, y), 0, x*y)", {"x": 1.5, "y": 2.5})
+        expression = compile_expression("if(even(x), x, 0 - x)", Environment(["gradient_test"]), ["x"])
+        self.assertEqual(expression.gradient(x=4), (4, {"x": 1}))
+        self.assertEqual(expression.gradient(x=3), (-3, {"x": -1}))
+
+    def test_selected_variables(self):
+        expression = compile_expression("x*y", Environment(), ["x", "y"])
+        self.assertEqual(expression.gradient(vars=["y"], x=3, y=4), (12, {"y": 3}))
+
+    def test_constant_expression(self):
+        expression = compile_expression("2 + 3", Environment(), ["x"])
+        self.assertEqual(expression.gradient(x=1), (5, {"x": 0}))
+
+    def test_comparison_result(self):
+        expression = compile_expression("x > 1", Environment(), ["x"])
+        self.assertEqual(expression.gradient(x=2), (True, {"x": 0}))
+
+    def test_power_of_constant_base(self):
+        expression = compile_expression("0^x + x", Environment(), ["x"])
+        self.assertEqual(expression.gradient(x=0.5), (0.5, {"x": 1}))
+        self.assert_gradient("2^x + pow(3, x) + x^2 + pow(x, 3)", {"x": 0.5})
+
+    def test_power_of_negative_base(self):
+        for source in ["(0 - 2)^x", "pow(0 - 2, x)"]:
+            expression = compile_expression(source, Environment(), ["x"])
+            with self.assertRaisesRegex(ValueError, "math domain error", msg=source):
+                expression.gradient(x=2)
+        for source in ["x^2", "pow(x, 2)"]:
+            expression = compile_expression(source, Environment(), ["x"])
+            self.assertEqual(expression.gradient(x=-3), (9, {"x": -6}), msg=source)
+
+    def test_function_without_derivative(self):
+        expression = compile_expression("twice(x)", Environment(["gradient_test"]), ["x"])
+        with self.assertRaisesRegex(ValueError, "No derivative rule for function: twice"):
+            expression.gradient(x=1.5)
+
+    def test_function_without_derivative_of_constant(self):
+        expression = compile_expression("twice(2) + x", Environment(["gradient_test"]), ["x"])
+        self.assertEqual(expression.gradient(x=1), (5, {"x": 1}))
+
+    def test_dual_numbers(self):
+        x = Dual(2.0, (1, 0))
+        y = Dual(3.0, (0, 1))
+        result = x * y + math.pi
+        self.assertEqual(result.value, 6.0 + math.pi)
+        self.assertEqual(result.partials, (3.0, 2.0))
+        self.assertTrue(x < y)
+        self.assertTrue(x == 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
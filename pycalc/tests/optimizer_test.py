@@ -0,0 +1,86 @@
+import itertools
+import unittest
+
+from pycalc.compile.expression import Environment, compile_expression
+from pycalc.compile.optimizer import *
+from pycalc.compile.tree import build_tree
+
+# Expressions for comparison of optimized and original results.
+EXPRESSIONS = ["x^2 + y/2.0 + x*1 + 0 + x", "x*x*x*x*x*x", "x^3 - y^4 + x^1", "2*3 + x/3 - 1*y",
+               "(x < y)*1 + 0", "x/0.25 + y/4 + x/0.1", "x^2/y", "if(x > y, x*1, y^2)", "x - 0 + (y + 0)"]
+# Values of variables for comparison of optimized and original results.
+VALUES = [0, 3, -2, 7.5, -0.0, 1e200, float("nan"), True]
+
+
+def evaluate(expression, x, y):
+    try:
+        result = expression.evaluate(x=x, y=y)
+        return type(result), repr(result)
+    except Exception as e:
+        return type(e)
+
+
+class OptimizerTest(unittest.TestCase):
+    def optimized_tree(self, source, **kwargs):
+        expression = compile_expression(source, Environment(), ["x", "y"])
+        return repr(build_tree(optimize(expression, **kwargs).program))
+
+    def test_fold_constants(self):
+        self.assertEqual(self.optimized_tree("2*3 + x + 2^3"), "((6 + x) + 8)")
+
+    def test_fold_long_constant(self):
+        expression = compile_expression("x + 10^5000 - 10^5000", Environment(), ["x"])
+        self.assertEqual(optimize(expression).evaluate(x=3), 3)
+
+    def test_keep_lazy_and_big_constant_operations(self):
+        self.assertEqual(self.optimized_tree("if(x > 0, x, 7^(10^7))"), "if((x > 0), x, (7 ^ (10 ^ 7)))")
+        self.assertEqual(self.optimized_tree("and(x, 2*3) + or(1 + 1, x)"), "(and(x, (2 * 3)) + or(2, x))")
+        self.assertEqual(self.optimized_tree("x + 3^(10^6)"), "(x + (3 ^ 1000000))")
+
+    def test_keep_failing_constant_operation(self):
+        self.assertEqual(self.optimized_tree("x + 1/0"), "(x + (1 / 0))")
+
+    def test_power_to_multiplication(self):
+        self.assertEqual(self.optimized_tree("x^2 + y^4", strict=False), "((x * x) + (((y * y) * y) * y))")
+        self.assertEqual(self.optimized_tree("x^2", variable_types={"x": int}), "(x * x)")
+
+    def test_strict_keeps_float_power(self):
+        self.assertEqual(self.optimized_tree("x^2"), "(x ^ 2)")
+        self.assertEqual(self.optimized_tree("x^2", variable_types={"x": float}), "(x ^ 2)")
+
+    def test_multiplication_to_power(self):
+        self.assertEqual(self.optimized_tree("x*x*x*x*x*x + x^2*x^3", strict=False), "((x ^ 6) + (x ^ 5))")
+        self.assertEqual(self.optimized_tree("x*x*x*x*x"), "((((x * x) * x) * x) * x)")
+
+    def test_division_to_multiplication(self):
+        self.assertEqual(self.optimized_tree("x/4.0 + x/3"), "((x * 0.25) + (x / 3))")
+        self.assertEqual(self.optimized_tree("x/4.0 + x/3", strict=False), "((x * 0.25) + (x * 0.3333333333333333))")
+
+    def test_remove_identity(self):
+        self.assertEqual(self.optimized_tree("x*1 + 0 + (y - 0)", strict=False), "(x + y)")
+        self.assertEqual(self.optimized_tree("x*1 + 0 + (y - 0)", variable_types={"x": int, "y": float}),
+                         "(x + y)")
+        self.assertEqual(self.optimized_tree("x*1 + 0 + (y - 0)", variable_types={"x": float, "y": float}),
+                         "((x + 0) + y)")
+
+    def test_long_expression(self):
+        source = "+".join(["x"] * 600) + "*1"
+        expression = compile_expression(source, Environment(), ["x"])
+        optimized = optimize(expression, strict=False)
+        self.assertEqual(optimized.evaluate(x=2), 1200)
+        self.assertEqual(len(optimized.program), len(expression.program) - 2)
+        source = "*".join(["x"] * 600)
+        self.assertEqual(self.optimized_tree(source, strict=False), "(x ^ 600)")
+
+    def test_strict_keeps_results(self):
+        variable_types = [{}, {"x": int, "y": int}, {"x": float, "y": float}]
+        for source, types in itertools.product(EXPRESSIONS, variable_types):
+            expression = compile_expression(source, Environment(), ["x", "y"])
+            optimized = optimize(expression, variable_types=types)
+            for x, y in itertools.product(VALUES, VALUES):
+                if all(type(value) == types.get(name, type(value)) for name, value in (("x", x), ("y", y))):
+                    self.assertEqual(evaluate(optimized, x, y), evaluate(expression, x, y), (source, types, x, y))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -237,6 +237,14 @@ class ParseTest(unittest.TestCase):
                            Token(TokenType.CLOSE_BRACE)]
         self.assertEqual(tokens, expected_tokens)
 
+    def test_parse_conditional_function(self):
+        tokens = Parser("if(x, 1, 2)", {}, {}, ["x"]).parse_tokens()
+        expected_tokens = [ConditionalToken("if", 3), Token(TokenType.OPEN_BRACE), VariableToken("x"),
+                           Token(TokenType.DELIMITER), NumberToken(1),
+                           Token(TokenType.DELIMITER), NumberToken(2),
+                           Token(TokenType.CLOSE_BRACE)]
+        self.assertEqual(tokens, expected_tokens)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from pycalc.compile.expression import Environment, compile_expression
+from pycalc.profiling import *
+
+# Representative expressions with values of their variables.
+EXPRESSIONS = [
+    ("2+2*2", {}),
+    ("sin(x)^2 + cos(x)^2", {"x": 1.5}),
+    ("if(x > 0, sqrt(x), 0)*x/3 + round(x // 2 % 7)", {"x": 2.0}),
+    ("and(x, or(0, x)) + log10(10)5 - abs(x - 100)", {"x": 3}),
+]
+# Allocation budgets of one evaluation of expression which was already evaluated once. Blocks count only memory
+# retained after evaluation, so short-lived objects created on every step are caught by peak budget.
+EVALUATE_MAX_BLOCKS = 8
+EVALUATE_MAX_PEAK = 512
+# Allocation budgets of parsing, retained memory includes compiled expression itself.
+PARSE_MAX_BLOCKS = 100
+PARSE_MAX_PEAK = 16 * 1024
+
+
+class ProfilingTest(unittest.TestCase):
+    def test_profile_memory_returns_result(self):
+        result, profile = profile_memory(lambda size: [0] * size, 1000)
+        self.assertEqual(len(result), 1000)
+        self.assertGreaterEqual(profile.size, 8000)
+        self.assertGreaterEqual(profile.peak, 8000)
+
+    def test_format_profile(self):
+        self.assertEqual(format_profile("parse", MemoryProfile(1, 2, 3)),
+                         "parse: 1 blocks, 2 bytes retained, 3 bytes peak")
+
+    def test_evaluation_allocation_budget(self):
+        environment = Environment()
+        for source, values in EXPRESSIONS:
+            expression = compile_expression(source, environment, list(values))
+            expression.evaluate(**values)
+            for _ in range(3):
+                _, profile = profile_memory(expression.evaluate, **values)
+                self.assertLessEqual(profile.blocks, EVALUATE_MAX_BLOCKS, source)
+                self.assertLessEqual(profile.peak, EVALUATE_MAX_PEAK, source)
+
+    def test_evaluation_does_not_grow(self):
+        expression = compile_expression("sin(x)^2 + cos(x)^2", Environment(), ["x"])
+
+        def evaluate_many():
+            for i in range(1000):
+                expression.evaluate(x=i)
+
+        evaluate_many()
+        _, profile = profile_memory(evaluate_many)
+        self.assertLessEqual(profile.blocks, EVALUATE_MAX_BLOCKS)
+        self.assertLessEqual(profile.peak, EVALUATE_MAX_PEAK)
+
+    def test_parse_allocation_budget(self):
+        environment = Environment()
+        for source, values in EXPRESSIONS:
+            compile_expression(source, environment, list(values))
+            _, profile = profile_memory(compile_expression, source, environment, list(values))
+            self.assertLessEqual(profile.blocks, PARSE_MAX_BLOCKS, source)
+            self.assertLessEqual(profile.peak, PARSE_MAX_PEAK, source)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,10 @@ def sin(number):
     return two
 
 
+def fail():
+    raise AssertionError("Argument has to be skipped")
+
+
 class PycalcTest(unittest.TestCase):
     def test_evaluate_sum(self):
         result = pycalc.evaluate([], "1034 + 13.678")
@@ -126,6 +130,49 @@ class PycalcTest(unittest.TestCase):
         expression = "1*4+3.3/(3+0.3)*3(sqrt(4))/(sin(0)+1)"
         self.assertEqual(10.0, pycalc.evaluate([], expression))
 
+    def test_evaluate_does_not_change_modules(self):
+        modules = ["pycalc_test"]
+        pycalc.evaluate(modules, "two")
+        self.assertEqual(modules, ["pycalc_test"])
+
+    def test_evaluate_if(self):
+        self.assertEqual(2, pycalc.evaluate([], "if(1 > 0, 2, 3)"))
+        self.assertEqual(3, pycalc.evaluate([], "if(1 < 0, 2, 3)"))
+        self.assertEqual(10, pycalc.evaluate([], "2if(0, 1, 5)"))
+
+    def test_evaluate_if_with_arithmetic_condition(self):
+        self.assertEqual(20, pycalc.evaluate([], "if(0 - 2 > 1, 10, 20)"))
+        self.assertEqual(10, pycalc.evaluate([], "if(2^3 - 1 >= 3*2 + 1, 10, 20)"))
+        self.assertEqual(20, pycalc.evaluate([], "if(1 + 1 == 2^2 // 3, 10, 20)"))
+
+    def test_evaluate_comparison_priority(self):
+        self.assertEqual(False, pycalc.evaluate([], "0 - 2 > 1"))
+        self.assertEqual(True, pycalc.evaluate([], "2 + 2 == 2*2"))
+
+    def test_evaluate_if_skips_branch(self):
+        self.assertEqual(3, pycalc.evaluate(["pycalc_test"], "if(0, fail(), 3)"))
+        self.assertEqual(2, pycalc.evaluate(["pycalc_test"], "if(two, two, fail())"))
+
+    def test_evaluate_and_or(self):
+        self.assertEqual(0, pycalc.evaluate(["pycalc_test"], "and(0, fail())"))
+        self.assertEqual(3, pycalc.evaluate([], "and(1, 2, 3)"))
+        self.assertEqual(2, pycalc.evaluate(["pycalc_test"], "or(0, two, fail())"))
+        self.assertEqual(False, pycalc.evaluate([], "or(1 > 2, 2 > 3)"))
+
+    def test_evaluate_not(self):
+        self.assertEqual(False, pycalc.evaluate([], "not(1 < 2)"))
+        self.assertEqual(True, pycalc.evaluate([], "not(0)"))
+
+    def test_evaluate_nested_conditions(self):
+        self.assertEqual(10, pycalc.evaluate([], "if(and(1, 0), 1, if(or(0, 1), 10, 20))"))
+        self.assertEqual(4, pycalc.evaluate([], "pow(if(1, 2, 3), and(3, 2))"))
+
+    def test_evaluate_if_wrong_arguments_count(self):
+        with self.assertRaisesRegex(ValueError, "Function if requires 3 arguments"):
+            pycalc.evaluate([], "if(1, 2)")
+        with self.assertRaisesRegex(ValueError, "Function or requires at least 2 arguments"):
+            pycalc.evaluate([], "or(1)")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import unittest
+
+from pycalc.compile.store import *
+
+
+class ExpressionStoreTest(unittest.TestCase):
+    def test_get_compiles_once(self):
+        store = ExpressionStore()
+        self.assertIs(store.get("x^2", ["x"]), store.get("x^2", ["x"]))
+        self.assertEqual(len(store), 1)
+
+    def test_evaluate(self):
+        store = ExpressionStore(shards=2)
+        self.assertEqual(store.evaluate("x*y + 1", x=2, y=3), 7)
+        self.assertEqual(store.evaluate("x*y + 1", x=4, y=3), 13)
+        self.assertEqual(len(store), 1)
+
+    def test_compile_error_is_not_stored(self):
+        store = ExpressionStore()
+        with self.assertRaisesRegex(ValueError, "Unknown token: x"):
+            store.get("x + 1")
+        self.assertEqual(len(store), 0)
+
+    def test_max_cost(self):
+        store = ExpressionStore(max_cost=100)
+        self.assertEqual(store.evaluate("2^10"), 1024)
+        with self.assertRaisesRegex(ValueError, "exceeds budget 100"):
+            store.evaluate("10^100000")
+        self.assertEqual(len(store), 1)
+
+    def test_max_size(self):
+        store = ExpressionStore(shards=2, max_size=4)
+        for number in range(20):
+            self.assertEqual(store.evaluate(str(number) + " + 1"), number + 1)
+        self.assertLessEqual(len(store), 4)
+        self.assertIs(store.get("x + 19", ["x"]), store.get("x + 19", ["x"]))
+        with self.assertRaisesRegex(ValueError, "Store size has to be at least count of shards"):
+            ExpressionStore(shards=4, max_size=2)
+
+    def test_wrong_shards_count(self):
+        with self.assertRaisesRegex(ValueError, "Store requires at least 1 shard"):
+            ExpressionStore(shards=0)
+
+    def test_shared_between_threads(self):
+        store = ExpressionStore(shards=4)
+        expressions = ["x + " + str(i) for i in range(20)]
+        compiled, errors = [], []
+
+        def run():
+            try:
+                for i, expression in enumerate(expressions):
+                    compiled.append(store.get(expression, ["x"]))
+                    self.assertEqual(store.evaluate(expression, x=1), i + 1)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(store), len(expressions))
+        self.assertEqual(len(set(map(id, compiled))), len(expressions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+
+from pycalc.compile.expression import Environment, compile_expression
+from pycalc.compile.optimizer import optimize
+from pycalc.compile.store import ExpressionStore
+from pycalc.compile.tiering import *
+
+# Expressions for comparison of generated functions with interpreter.
+EXPRESSIONS = ["x + y*2 - x/y", "x^2 // 3 % y", "(x < y) + (x >= y)*2 + (x == 1) - (x != y)",
+               "sin(x)^2 + cos(y)^2 + log(x, 2)", "if(x > y, x, if(y > 2, y, 0)) + and(x, y) + or(0, x, y)",
+               "not(x) + abs(x - y) + round(y/3)", "1 - 3 + x"]
+
+
+class TieringTest(unittest.TestCase):
+    def compile(self, source):
+        return compile_expression(source, Environment(), ["x", "y"])
+
+    def test_generate_function(self):
+        for source in EXPRESSIONS:
+            expression = self.compile(source)
+            function = generate_function(expression)
+            for x, y in [(1, 2), (3.5, 1.25), (0.5, 7)]:
+                self.assertEqual(function(x, y), expression.evaluate(x=x, y=y), (source, x, y))
+
+    def test_generate_function_with_special_constants(self):
+        expression = optimize(self.compile("inf - x + (1 - 4) + nan"))
+        self.assertEqual(repr(generate_function(expression)(1, 2)), "nan")
+        expression = optimize(self.compile("inf - x + (1 - 4)"))
+        self.assertEqual(generate_function(expression)(1, 2), float("inf"))
+
+    def test_generate_function_with_long_constant(self):
+        expression = optimize(self.compile("x + 10^5000 + y"))
+        self.assertEqual(generate_function(expression)(1, 2), 10 ** 5000 + 3)
+
+    def test_promote_after_threshold(self):
+        tiered = TieredExpression(self.compile("x + y"), threshold=3)
+        for calls in range(1, 3):
+            self.assertEqual(tiered.evaluate(x=calls, y=1), calls + 1)
+            self.assertEqual(tiered.tier, INTERPRETER_TIER)
+        tiered.evaluate(x=0, y=0)
+        self.assertTrue(tiered.wait_promoted(10))
+        self.assertEqual(tiered.tier, COMPILED_TIER)
+        self.assertEqual(tiered.evaluate(x=5, y=1), 6)
+        self.assertEqual(tiered.stats(), {"source": "x + y", "tier": COMPILED_TIER, "calls": 4, "threshold": 3})
+
+    def test_never_promote_without_threshold(self):
+        tiered = TieredExpression(self.compile("x + y"), threshold=None)
+        for _ in range(10):
+            tiered.evaluate(x=1, y=1)
+        self.assertEqual(tiered.tier, INTERPRETER_TIER)
+
+    def test_missing_variable_in_compiled_tier(self):
+        tiered = TieredExpression(self.compile("x + y"))
+        tiered.promote()
+        with self.assertRaisesRegex(ValueError, "Missing value for variable: y"):
+            tiered.evaluate(x=1)
+
+    def test_failed_promotion(self):
+        source = "(1 + " * 300 + "x" + ")" * 300
+        tiered = TieredExpression(self.compile(source))
+        tiered.promote()
+        self.assertEqual(tiered.tier, FAILED_TIER)
+        self.assertIsInstance(tiered.error, SyntaxError)
+        self.assertEqual(tiered.evaluate(x=2, y=0), 302)
+
+    def test_promotion_failed_with_any_error(self):
+        tiered = TieredExpression(self.compile("x + y"))
+        with mock.patch("pycalc.compile.tiering.generate_function", side_effect=TypeError("broken")):
+            tiered.promote()
+        self.assertEqual(tiered.tier, FAILED_TIER)
+        self.assertIsInstance(tiered.error, TypeError)
+        self.assertEqual(tiered.evaluate(x=2, y=3), 5)
+
+    def test_store_with_tiers(self):
+        store = ExpressionStore(tier_threshold=2)
+        for _ in range(2):
+            store.evaluate("x*y", x=2, y=3)
+        store.get("x*y", ["x", "y"]).wait_promoted(10)
+        self.assertEqual(store.stats(), [{"source": "x*y", "tier": COMPILED_TIER, "calls": 2, "threshold": 2}])
+        self.assertEqual(store.evaluate("x*y", x=2, y=4), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from pycalc.compile.expression import Environment, compile_expression
+from pycalc.compile.tree import *
+from pycalc.pycalc import calculate
+
+
+class TreeTest(unittest.TestCase):
+    def setUp(self):
+        self.environment = Environment()
+
+    def test_build_tree(self):
+        tree = build_tree(compile_expression("1 + 2x", self.environment, ["x"]).program)
+        expected = OperationNode("+", NumberNode(1), OperationNode("*", NumberNode(2), VariableNode("x")))
+        self.assertEqual(tree, expected)
+
+    def test_build_tree_with_conditions(self):
+        tree = build_tree(compile_expression("if(x, sin(x), or(x, 2))", self.environment, ["x"]).program)
+        expected = ConditionalNode("if", (VariableNode("x"), CallNode(self.environment.functions["sin"],
+                                                                      (VariableNode("x"),)),
+                                          ConditionalNode("or", (VariableNode("x"), NumberNode(2)))))
+        self.assertEqual(tree, expected)
+
+    def test_numbers_of_different_types_are_not_equal(self):
+        self.assertNotEqual(NumberNode(1), NumberNode(1.0))
+        self.assertNotEqual(NumberNode(1), NumberNode(True))
+        self.assertNotEqual(NumberNode(0.0), NumberNode(-0.0))
+        self.assertEqual(NumberNode(float("nan")), NumberNode(float("nan")))
+        self.assertEqual(NumberNode(10 ** 5000), NumberNode(10 ** 5000))
+        self.assertNotEqual(NumberNode(10 ** 5000), NumberNode(10 ** 5000 + 1))
+
+    def test_build_program_back(self):
+        for source in ["1 + 2x", "if(x > 0, sin(x), and(x, 2, 3)) + or(0, x)", "pow(x, if(1, 2, 3))"]:
+            program = compile_expression(source, self.environment, ["x"]).program
+            rebuilt = build_program(build_tree(program))
+            self.assertEqual(rebuilt, list(program))
+            self.assertEqual(calculate(rebuilt, {"x": 1.5}), calculate(program, {"x": 1.5}))
+
+    def test_transform_and_build_long_tree(self):
+        program = compile_expression("+".join(["x"] * 2000), self.environment, ["x"]).program
+        tree = transform(build_tree(program), lambda node, children: type(node)(node.operation, *children)
+                         if isinstance(node, OperationNode) else node)
+        self.assertEqual(build_program(tree), list(program))
+        self.assertEqual(hash(tree), hash(build_tree(program)))
+        self.assertEqual(tree, build_tree(program))
+
+
+if __name__ == '__main__':
+    unittest.main()